@@ -0,0 +1,125 @@
+import os
+
+
+# === Token Bucket Rate Limiting ===
+class RateLimiter:
+    """Token buckets keyed by (guild, user), one float per key.
+
+    Uses the GCRA form of a token bucket: instead of (tokens, last_seen)
+    each key stores the time its bucket will be full again. A key whose
+    stored time has passed is indistinguishable from a new one, so idle
+    keys are dropped exactly by rotating two generations of dicts; memory
+    tracks recently active users only.
+    """
+
+    __slots__ = ("interval", "tolerance", "rotate_after", "current", "previous", "rotated_at")
+
+    def __init__(self, rate, burst):
+        self.interval = 1.0 / rate                  # seconds per token
+        self.tolerance = self.interval * (burst - 1)
+        # A bucket refills completely within this long, so anything not
+        # touched for a whole generation can go
+        self.rotate_after = max(self.interval * burst, 1.0)
+        self.current = {}
+        self.previous = {}
+        self.rotated_at = 0.0
+
+    @staticmethod
+    def key(guild_id, user_id):
+        return (guild_id << 64) | user_id
+
+    def hit(self, key, now):
+        """Take one token; False if the bucket is empty"""
+        if now - self.rotated_at >= self.rotate_after:
+            self.previous = self.current
+            self.current = {}
+            self.rotated_at = now
+        tat = self.current.get(key)
+        if tat is None:
+            tat = self.previous.pop(key, now)
+        if tat < now:
+            tat = now
+        if tat - now > self.tolerance:
+            self.current[key] = tat
+            return False
+        self.current[key] = tat + self.interval
+        return True
+
+    def reset(self, key):
+        self.current.pop(key, None)
+        self.previous.pop(key, None)
+
+    def __len__(self):
+        return len(self.current) + len(self.previous)
+
+
+# === Anti-Spam Policy ===
+class AntiSpam:
+    """Decides, per message, whether it earns reputation and what to do.
+
+    - ``earn``: messages that earn reputation (a few per minute)
+    - ``flood``: sustained message rate; going over deletes the message
+    - ``strikes``: deleted messages; running out times the member out
+    """
+
+    def __init__(self, earn_rate=0.2, earn_burst=3, flood_rate=1.0, flood_burst=6,
+                 strike_rate=0.05, strike_burst=5, timeout_minutes=10):
+        self.earn = RateLimiter(earn_rate, earn_burst)
+        self.flood = RateLimiter(flood_rate, flood_burst)
+        self.strikes = RateLimiter(strike_rate, strike_burst)
+        self.timeout_minutes = timeout_minutes
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ.get
+        return cls(
+            earn_rate=float(env("ANTISPAM_EARN_RATE", 0.2)),
+            earn_burst=int(env("ANTISPAM_EARN_BURST", 3)),
+            flood_rate=float(env("ANTISPAM_FLOOD_RATE", 1.0)),
+            flood_burst=int(env("ANTISPAM_FLOOD_BURST", 6)),
+            strike_rate=float(env("ANTISPAM_STRIKE_RATE", 0.05)),
+            strike_burst=int(env("ANTISPAM_STRIKE_BURST", 5)),
+            timeout_minutes=float(env("ANTISPAM_TIMEOUT_MINUTES", 10)),
+        )
+
+    def check(self, guild_id, user_id, now):
+        """Return ``(earns_reputation, action)``; action is None, "delete" or "timeout" """
+        key = RateLimiter.key(guild_id, user_id)
+        if self.flood.hit(key, now):
+            return self.earn.hit(key, now), None
+        if self.strikes.hit(key, now):
+            return False, "delete"
+        # Out of strikes: time out once, then start over
+        self.strikes.reset(key)
+        return False, "timeout"
+
+    def tracked(self):
+        return len(self.earn) + len(self.flood) + len(self.strikes)
+
+
+if __name__ == "__main__":
+    # python antispam.py - per-message cost and memory over many users
+    import random
+    import time
+    import tracemalloc
+
+    users = 1_000_000
+    messages = 2_000_000
+    rng = random.Random(0)
+    traffic = [rng.randrange(users) for _ in range(messages)]
+    now = 1_700_000_000.0
+
+    spam = AntiSpam()
+    started = time.perf_counter()
+    for i, user_id in enumerate(traffic):
+        spam.check(1, user_id, now + i * 0.0005)
+    wall = time.perf_counter() - started
+
+    # Second pass just for memory; tracemalloc skews the timing
+    spam = AntiSpam()
+    tracemalloc.start()
+    for i, user_id in enumerate(traffic):
+        spam.check(1, user_id, now + i * 0.0005)
+    current, peak = tracemalloc.get_traced_memory()
+    print(f"⏱️ {wall / messages * 1e6:.2f} µs/message over {users:,} users")
+    print(f"🧠 {spam.tracked():,} live entries, {current / 1024 / 1024:.1f} MB (peak {peak / 1024 / 1024:.1f} MB)")
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+import time
+
+import discord
+
+from dispatcher import BulkDispatcher
+from logs import get_logger
+
+log = get_logger("backfill")
+
+
+# === Reputation Backfill ===
+# Seeds reputation from messages sent before the bot was counting. Each
+# text channel's history is streamed newest-first, several channels at a
+# time. Points are summed per user in memory; every ``batch_size`` counted
+# messages the sums go to the store, the store is saved and a checkpoint
+# records how far back each channel has been read. A rerun after an
+# interruption starts from the checkpoint, and memory never holds more
+# than one batch's per-user totals, however long the history is.
+class BackfillCheckpoint:
+    """Progress of one guild's backfill, saved as JSON next to the store.
+
+    ``cutoff`` is the message ID the run started below (messages after it
+    were already counted live). ``channels`` maps each channel to the
+    oldest message counted so far and ``done`` lists finished channels.
+    """
+
+    def __init__(self, path, cutoff, channels=None, done=(), messages=0, finished=False):
+        self.path = path
+        self.cutoff = cutoff
+        self.channels = channels or {}  # str(channel_id) -> message ID
+        self.done = list(done)          # str(channel_id)
+        self.messages = messages        # messages read so far
+        self.finished = finished
+
+    @classmethod
+    def load(cls, path):
+        """The saved checkpoint, or None if there is none (or it's unreadable)"""
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return cls(path, data["cutoff"], data.get("channels"), data.get("done", ()),
+                   data.get("messages", 0), data.get("finished", False))
+
+    def save(self):
+        data = {
+            "cutoff": self.cutoff,
+            "channels": self.channels,
+            "done": self.done,
+            "messages": self.messages,
+            "finished": self.finished,
+        }
+        # Same temp-file-and-swap as the JSON store, so a crash mid-write
+        # leaves the previous checkpoint intact
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class Backfill:
+    """One guild's backfill run.
+
+    The store is saved before the checkpoint, so a crash between the two
+    can count at most one batch again and never skips one. Channels the
+    bot can't read, and channels the guild ignores for reputation, are
+    left out. Bot messages earn nothing, as in on_message.
+    """
+
+    def __init__(self, service, guild, checkpoint, batch_size=5000, concurrency=8):
+        self.service = service
+        self.guild = guild
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        # One history stream per channel, several channels at once;
+        # discord.py waits out any 429s per route
+        self.dispatcher = BulkDispatcher(concurrency=concurrency, per_bucket=1)
+        self.cursors = dict(checkpoint.channels)
+        self.done = set(checkpoint.done)
+        self.scanned = checkpoint.messages
+        self.channels = 0
+        self.finished = False
+        self.pending = {}           # user_id -> points not in the store yet
+        self.pending_messages = 0
+        self.started = time.perf_counter()
+        self._scanned_at_start = checkpoint.messages
+        self._commit_lock = asyncio.Lock()
+        self._config = None
+        self.task = None            # set by whoever runs it
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        rate = (self.scanned - self._scanned_at_start) / elapsed if elapsed > 0 else 0.0
+        return (f"{len(self.done)}/{self.channels} channels, {self.scanned:,} messages "
+                f"({rate:,.0f}/s) in {elapsed:.0f}s")
+
+    async def run(self, progress=None):
+        """Read every remaining channel; returns the dispatcher's BulkResult.
+
+        ``await progress(self)`` is called every couple of seconds.
+        Pending points are committed however the run ends, cancellation
+        included.
+        """
+        self._config = self.service.config(self.guild.id)
+        me = self.guild.me
+        channels = [
+            channel for channel in self.guild.text_channels
+            if channel.id not in self._config.ignored_channels
+            and channel.permissions_for(me).read_message_history
+        ]
+        self.channels = len(channels)
+        self.done &= {str(channel.id) for channel in channels}
+
+        async def report(result):
+            if progress:
+                await progress(self)
+
+        try:
+            result = await self.dispatcher.run(
+                channels, self._scan,
+                bucket=lambda channel: channel.id,
+                skip=lambda channel: str(channel.id) in self.done,
+                progress=report,
+            )
+            self.finished = not result.failed
+            return result
+        finally:
+            await self.commit()
+
+    async def _scan(self, channel):
+        key = str(channel.id)
+        # Retries after a failed request resume from the in-memory cursor
+        before = discord.Object(self.cursors.get(key, self.checkpoint.cutoff))
+        async for message in channel.history(limit=None, before=before):
+            # Cursor and points move together, so a checkpoint never holds
+            # one without the other
+            self.cursors[key] = message.id
+            self.scanned += 1
+            if message.author.bot:
+                continue
+            user_id = message.author.id
+            self.pending[user_id] = self.pending.get(user_id, 0) + self._config.message_points(message.content)
+            self.pending_messages += 1
+            if self.pending_messages >= self.batch_size:
+                await self.commit()
+        self.done.add(key)
+
+    async def commit(self):
+        """Add the pending points to the store, save it, then checkpoint"""
+        async with self._commit_lock:
+            points, self.pending = self.pending, {}
+            self.pending_messages = 0
+            self.checkpoint.channels = dict(self.cursors)
+            self.checkpoint.done = sorted(self.done)
+            self.checkpoint.messages = self.scanned
+            self.checkpoint.finished = self.finished
+            write = asyncio.ensure_future(asyncio.to_thread(self._write, points))
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                # Let the batch land before the final commit runs
+                await write
+                raise
+
+    def _write(self, points):
+        if points:
+            self.service.add_many(self.guild.id, points)
+            self.service.flush()
+        self.checkpoint.save()
+        log.debug("Backfill checkpoint", guild=self.guild.id, users=len(points), messages=self.scanned)
+
+
+def checkpoint_path(guild_id):
+    return os.path.join(os.environ.get("BACKFILL_DIR", "backfill"), f"{guild_id}.json")
+
+
+def backfill_from_env(service, guild, checkpoint):
+    """Backfill with BACKFILL_BATCH messages per store write and BACKFILL_CHANNELS streams"""
+    env = os.environ.get
+    return Backfill(service, guild, checkpoint,
+                    batch_size=int(env("BACKFILL_BATCH", 5000)),
+                    concurrency=int(env("BACKFILL_CHANNELS", 8)))
@@ -0,0 +1,463 @@
+"""Offline benchmark: replays synthetic gateway traffic through main.py's handlers.
+
+    python benchmark.py [--users 1000,10000,100000,1000000] [--rtt 0] [--backfill 1000000] [--json out.json]
+
+No Discord connection is made. Messages, members, guilds and channels are
+small fakes, and every REST call they would make is counted and
+optionally delayed by ``--rtt`` seconds. Compare the JSON output run over
+run to see what a persistence or caching change did.
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+# Keep the bot's files out of the working tree and make sure it never logs in
+_workdir = tempfile.mkdtemp(prefix="xguard-bench-")
+os.environ.pop("TOKEN", None)
+os.environ.setdefault("REP_DIR", os.path.join(_workdir, "reputation"))
+os.environ.setdefault("REP_PATH", os.path.join(_workdir, "reputation.json"))
+os.environ.setdefault("REP_DB_PATH", os.path.join(_workdir, "reputation.db"))
+os.environ.setdefault("TIMERS_PATH", os.path.join(_workdir, "timers.json"))
+os.environ.setdefault("REP_FLUSH_INTERVAL", "3600")
+
+import discord
+
+from gateway import rss_mb
+
+
+# === Fake Discord Objects ===
+class Rest:
+    """Counts (and optionally delays) every would-be REST call"""
+
+    def __init__(self, rtt=0.0):
+        self.rtt = rtt
+        self.calls = 0
+
+    async def call(self):
+        self.calls += 1
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+
+
+_ids = itertools.count(10**17)
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+
+class FakeRole:
+    def __init__(self, name, position=0):
+        self.id = next(_ids)
+        self.name = name
+        self.mention = f"<@&{self.id}>"
+        self.position = position
+
+    def __eq__(self, other):
+        return isinstance(other, FakeRole) and other.id == self.id
+
+    def __hash__(self):
+        return self.id
+
+
+class FakeMember:
+    def __init__(self, rest, guild, user_id, bot=False, permissions=None):
+        self.rest = rest
+        self.guild = guild
+        self.id = user_id
+        self.bot = bot
+        self.name = f"user{user_id % 100000}"
+        self.display_name = self.name
+        self.discriminator = "0"
+        self.mention = f"<@{user_id}>"
+        self.created_at = NOW - datetime.timedelta(days=400)
+        self.joined_at = NOW - datetime.timedelta(days=30)
+        self.status = discord.Status.online
+        self.activity = None
+        self.color = discord.Color.default()
+        self.avatar = None
+        self.roles = [guild.default_role]
+        self.guild_permissions = permissions or discord.Permissions.none()
+
+    @property
+    def top_role(self):
+        return self.roles[-1]
+
+    async def add_roles(self, *roles, reason=None):
+        await self.rest.call()
+        self.roles.extend(roles)
+
+    async def remove_roles(self, *roles, reason=None):
+        await self.rest.call()
+        self.roles = [r for r in self.roles if r not in roles]
+
+    async def timeout(self, until, reason=None):
+        await self.rest.call()
+
+    def is_timed_out(self):
+        return False
+
+
+class FakeMessage:
+    def __init__(self, rest, channel, author, content, created_at=None):
+        self._state = None
+        self.rest = rest
+        self.id = next(_ids)
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.attachments = []
+        self.created_at = created_at or NOW
+
+    async def delete(self, delay=None):
+        await self.rest.call()
+
+    async def edit(self, **kwargs):
+        await self.rest.call()
+
+
+class FakeChannel:
+    def __init__(self, rest, guild, history_size=0):
+        self.rest = rest
+        self.guild = guild
+        self.id = next(_ids)
+        self.name = f"channel{self.id % 1000}"
+        self.slowmode_delay = 0
+        self.history_size = history_size
+        self._overwrites = {}
+
+    async def send(self, content=None, **kwargs):
+        await self.rest.call()
+        return FakeMessage(self.rest, self, self.guild.me, content or "")
+
+    def get_partial_message(self, message_id):
+        return FakeMessage(self.rest, self, self.guild.me, "")
+
+    async def history(self, limit=None, before=None, after=None, oldest_first=False):
+        # Newest first, one page (one REST call) per 100 messages; the last
+        # fifth of the history is older than 14 days
+        total = min(limit or self.history_size, self.history_size)
+        for i in range(total):
+            if i % 100 == 0:
+                await self.rest.call()
+            age = datetime.timedelta(days=20 if i > total * 0.8 else 1, seconds=i)
+            yield FakeMessage(self.rest, self, self.guild.me, f"message {i}", NOW - age)
+
+    async def delete_messages(self, messages, reason=None):
+        await self.rest.call()
+
+    def permissions_for(self, member):
+        return member.guild_permissions
+
+    def overwrites_for(self, role):
+        return self._overwrites.get(role.id, discord.PermissionOverwrite())
+
+    async def set_permissions(self, role, **perms):
+        await self.rest.call()
+        self._overwrites[role.id] = discord.PermissionOverwrite(**perms)
+
+    async def edit(self, **kwargs):
+        await self.rest.call()
+
+
+class HistoryChannel(FakeChannel):
+    """Channel with ``history_size`` member messages, paged like the real endpoint.
+
+    Message IDs run from ``first_id`` upwards in posting order, so
+    ``before=`` resumes work as they do against Discord.
+    """
+
+    def __init__(self, rest, guild, history_size, authors):
+        super().__init__(rest, guild, history_size)
+        self.authors = authors
+        self.first_id = (next(_ids) - 10**17) * 10**7  # well below snowflakes for NOW
+
+    def message_at(self, index):
+        author = self.authors[(index * 7919 + self.id) % len(self.authors)]
+        return FakeMessage(self.rest, self, author, "x" * (index % 150))
+
+    async def history(self, limit=None, before=None, after=None, oldest_first=False):
+        top = self.history_size
+        if before is not None:
+            top = min(top, max(before.id - self.first_id, 0))
+        for n, index in enumerate(range(top - 1, -1, -1)):
+            if limit is not None and n >= limit:
+                return
+            if n % 100 == 0:
+                await self.rest.call()
+            message = self.message_at(index)
+            message.id = self.first_id + index
+            yield message
+
+
+class FakeGuild:
+    def __init__(self, rest, channels=20):
+        self.rest = rest
+        self.id = next(_ids)
+        self.name = f"guild{self.id % 1000}"
+        self.icon = None
+        self.features = []
+        self.default_role = FakeRole("@everyone")
+        self.roles = [self.default_role]
+        self.me = FakeMember(rest, self, next(_ids), bot=True)
+        self.channels = [FakeChannel(rest, self) for _ in range(channels)]
+        self.text_channels = self.channels
+        self.system_channel = self.channels[0]
+
+    async def create_role(self, name, **kwargs):
+        await self.rest.call()
+        role = FakeRole(name, position=len(self.roles))
+        self.roles.append(role)
+        return role
+
+    def get_role(self, role_id):
+        return discord.utils.get(self.roles, id=role_id)
+
+    def get_channel(self, channel_id):
+        return discord.utils.get(self.channels, id=channel_id)
+
+
+class FakeContext:
+    """Just enough of responses.ResponseContext for the command callbacks"""
+
+    def __init__(self, rest, guild, channel, author, bot):
+        self.bot = bot
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+        self.message = FakeMessage(rest, channel, author, "$cmd")
+
+    def discard(self):
+        self.bot.cleanup.schedule(self.message)
+
+    async def send(self, content=None, delete_after=None, **kwargs):
+        message = await self.channel.send(content, **kwargs)
+        if delete_after is not None:
+            self.bot.cleanup.schedule(message, delete_after)
+        return message
+
+
+# === Measurements ===
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    return {"p50_ms": round(pick(0.50), 4), "p99_ms": round(pick(0.99), 4)}
+
+
+async def time_calls(rest, runs, make_call, cleanup=None):
+    """Run ``make_call()`` coroutines one by one; latency and REST calls per run.
+
+    Deletes still queued in ``cleanup`` are flushed afterwards (untimed) so
+    they count towards the REST calls but not the user-visible latency.
+    """
+    samples = []
+    before = rest.calls
+    started = time.perf_counter()
+    for i in range(runs):
+        coro = make_call(i)
+        t0 = time.perf_counter()
+        await coro
+        samples.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    if cleanup is not None:
+        await cleanup.flush()
+    return {
+        "runs": runs,
+        "per_sec": round(runs / wall, 1),
+        **percentiles(samples),
+        "rest_calls_per_run": round((rest.calls - before) / runs, 2),
+    }
+
+
+def reset_state(main):
+    """Fresh in-memory reputation and anti-spam state between sizes"""
+    from antispam import AntiSpam
+    from duplicates import DuplicateDetector
+    from reputation import ReputationService
+
+    main.reputation_service = main.bot.reputation = ReputationService.from_env()
+    main.antispam = AntiSpam.from_env()
+    main.duplicates = DuplicateDetector.from_env()
+
+
+async def bench_messages(main, rest, users, guild):
+    """on_message throughput with ``users`` distinct authors"""
+    reset_state(main)
+    rng = random.Random(users)
+    # A wide vocabulary, so ordinary chatter isn't mistaken for copypasta
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(5000)]
+    members = {}
+    channel = guild.channels[0]
+
+    def author(user_id):
+        member = members.get(user_id)
+        if member is None:
+            member = members[user_id] = FakeMember(rest, guild, user_id)
+        return member
+
+    rss_before = rss_mb()
+    # Every user talks once (fills the store), then a second pass of
+    # random traffic measures steady-state throughput
+    fill = [FakeMessage(rest, channel, author(1000 + u), " ".join(rng.choices(words, k=rng.randint(1, 15))))
+            for u in range(users)]
+    started = time.perf_counter()
+    for message in fill:
+        await main.on_message(message)
+    fill_wall = time.perf_counter() - started
+    rss_after = rss_mb()
+
+    sample = min(users, 50_000)
+    traffic = [FakeMessage(rest, channel, author(1000 + rng.randrange(users)),
+                           " ".join(rng.choices(words, k=rng.randint(1, 15)))) for _ in range(sample)]
+    result = await time_calls(rest, sample, lambda i: main.on_message(traffic[i]))
+    members.clear()
+    fill.clear()
+    return {
+        "users": users,
+        "fill_msgs_per_sec": round(users / fill_wall, 1),
+        "on_message": result,
+        "rss_growth_mb": round(rss_after - rss_before, 1),
+        "bytes_per_user": round((rss_after - rss_before) * 1024 * 1024 / users, 1),
+    }
+
+
+async def bench_decay(main, users, guild):
+    """Lazy decay: first leaderboard query after everyone has gone idle for hours"""
+    service = main.reputation_service
+    service.top(guild.id, 10)   # build the guild's ranking first
+    later = time.time() + 6 * 3600
+    t0 = time.perf_counter()
+    service.top(guild.id, 10, now=later)
+    first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    service.top(guild.id, 10, now=later + 1)
+    again = time.perf_counter() - t0
+    return {"users": users, "catch_up_ms": round(first * 1000, 2), "steady_ms": round(again * 1000, 4)}
+
+
+async def bench_commands(main, rest, guild, runs):
+    admin = FakeMember(rest, guild, 42, permissions=discord.Permissions.all())
+    target = FakeMember(rest, guild, 1000)
+    channel = guild.channels[1]
+    ctx = lambda: FakeContext(rest, guild, channel, admin, main.bot)
+    cleanup = main.bot.cleanup
+    # Loaded after the resets so the cogs see the current reputation service
+    await main.load_extensions(main.bot)
+    command = main.bot.get_command
+    results = {}
+
+    results["rep"] = await time_calls(rest, runs, lambda i: command("rep")(ctx(), target), cleanup)
+    results["user"] = await time_calls(rest, runs, lambda i: command("user")(ctx(), target), cleanup)
+    results["top"] = await time_calls(rest, runs, lambda i: command("top")(ctx(), 10, 1), cleanup)
+    results["ping"] = await time_calls(rest, runs, lambda i: command("ping")(ctx()), cleanup)
+    results["cmds_list"] = await time_calls(rest, runs, lambda i: command("cmds")(ctx(), 1), cleanup)
+
+    # First mute sets up the Muted role in every channel; later ones reuse it
+    guild.roles = [r for r in guild.roles if r.name != "Muted"]
+    results["mute_first"] = await time_calls(rest, 1, lambda i: command("mute")(ctx(), target, 10), cleanup)
+    results["mute"] = await time_calls(rest, runs, lambda i: command("mute")(ctx(), target, 10), cleanup)
+    main.timers.stop()
+
+    from purge import PurgeFlags
+    history = FakeChannel(rest, guild, history_size=10_000)
+    purge_ctx = FakeContext(rest, guild, history, admin, main.bot)
+    flags = await PurgeFlags._construct_default(purge_ctx)
+    results["purge_10k"] = await time_calls(
+        rest, 1, lambda i: command("purge")(purge_ctx, 10_000, flags=flags), cleanup)
+    return results
+
+
+async def bench_backfill(main, rest, messages, channels=20, users=10_000):
+    """$backfill over ``messages`` of history, interrupted halfway and resumed"""
+    from backfill import BackfillCheckpoint, backfill_from_env
+
+    reset_state(main)
+    service = main.reputation_service
+    guild = FakeGuild(rest, channels=1)
+    guild.me.guild_permissions = discord.Permissions.all()
+    authors = [FakeMember(rest, guild, 2000 + u) for u in range(users)]
+    guild.channels = guild.text_channels = [
+        HistoryChannel(rest, guild, messages // channels, authors) for _ in range(channels)
+    ]
+    path = os.path.join(_workdir, "backfill", f"{guild.id}.json")
+    checkpoint = BackfillCheckpoint(path, discord.utils.time_snowflake(NOW))
+
+    rest_before = rest.calls
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    job = backfill_from_env(service, guild, checkpoint)
+    task = asyncio.create_task(job.run())
+    while job.scanned < messages // 2 and not task.done():
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    resumed_at = BackfillCheckpoint.load(path).messages
+    job = backfill_from_env(service, guild, BackfillCheckpoint.load(path))
+    await job.run()
+    wall = time.perf_counter() - started
+    rss_after = rss_mb()
+
+    # Every message counted exactly once, across the interruption
+    config = service.config(guild.id)
+    expected = {}
+    for channel in guild.channels:
+        for index in range(channel.history_size):
+            message = channel.message_at(index)
+            expected[message.author.id] = expected.get(message.author.id, 0) + config.message_points(message.content)
+    exact = all(
+        service.score(guild.id, user_id) == min(config.base_rep + points, config.max_rep)
+        for user_id, points in expected.items()
+    )
+    return {
+        "messages": job.scanned,
+        "msgs_per_sec": round(job.scanned / wall, 1),
+        "resumed_at": resumed_at,
+        "rest_calls": rest.calls - rest_before,
+        "rss_growth_mb": round(rss_after - rss_before, 1),
+        "finished": BackfillCheckpoint.load(path).finished,
+        "counted_once": exact,
+    }
+
+
+async def run(sizes, rtt, command_runs, backfill_messages):
+    import main
+    rest = Rest(rtt)
+    # process_commands compares authors against the logged-in user
+    main.bot._connection.user = FakeMember(rest, FakeGuild(rest, channels=1), 1)
+    guild = FakeGuild(rest)
+
+    report = {"rtt": rtt, "python": sys.version.split()[0], "messages": [], "decay": []}
+    for users in sizes:
+        report["messages"].append(await bench_messages(main, rest, users, guild))
+        report["decay"].append(await bench_decay(main, users, guild))
+        print(f"📈 {users:,} users done", file=sys.stderr)
+    report["commands"] = await bench_commands(main, rest, guild, command_runs)
+    if backfill_messages:
+        report["backfill"] = await bench_backfill(main, rest, backfill_messages)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", default="1000,10000,100000,1000000",
+                        help="comma-separated user counts")
+    parser.add_argument("--rtt", type=float, default=0.0, help="simulated seconds per REST call")
+    parser.add_argument("--runs", type=int, default=200, help="runs per command")
+    parser.add_argument("--backfill", type=int, default=1_000_000,
+                        help="messages of history for the backfill run (0 skips it)")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    sizes = [int(n) for n in args.users.split(",")]
+    report = asyncio.run(run(sizes, args.rtt, args.runs, args.backfill))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(text)
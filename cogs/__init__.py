@@ -0,0 +1,14 @@
+# === Command Extensions ===
+# Every command lives in one of these modules, each a discord.py extension
+# whose setup(bot) adds a single cog. main.py loads them all at startup and
+# `$reload` swaps them in place on the running bot: same gateway session,
+# same guild/member caches. Cogs hold no state worth keeping - reputation,
+# timers, raid windows, metrics and the like are created once in main.py
+# and handed over as bot attributes, so they survive a reload untouched.
+EXTENSIONS = [
+    "cogs.reputation",
+    "cogs.moderation",
+    "cogs.protection",
+    "cogs.utility",
+    "cogs.fun",
+]
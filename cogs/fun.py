@@ -0,0 +1,150 @@
+import random
+
+import discord
+from discord.ext import commands
+
+from logs import get_logger
+
+log = get_logger("fun")
+
+
+# === Entertainment Commands ===
+class Fun(commands.Cog):
+    """Quotes, jokes, dice and memes"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command()
+    async def caseoh(self, ctx):
+        """Get a random Caseoh quote"""
+        ctx.discard()
+
+        quotes = [
+            "Life. - Caseoh",
+            "Ellen, what did i tell you comin back to this STORE.",
+            "You goobers in the chat just say DOOR, DOOR, DOOR hululu",
+            "TIM IM GON KILL YOU (#code Caseoh StarforgeSystems.com for 10% off! :D)",
+            "Use cheeky hashtag code Caseoh for 10% off - Caseoh", 
+            "STARFORGESYSTEMS.COM - Caseoh",
+            "Dagum disgusting putrid loser - Caseoh",
+            "Just chill out and vibe. That's life right there. - Caseoh",
+            "As long as you don't know what's under the surface, you're good. - Caseoh",
+            "Door. - Caseoh",
+            "I'm not fat, I'm just big boneded. - Caseoh",
+            "Chat, I will end you. - Caseoh",
+            "This is why we can't have nice things. - Caseoh",
+            "You're actually disgusting. - Caseoh",
+            "I'm gonna scream. - Caseoh"
+        ]
+
+        # Ensure proper randomness
+        selected_quote = random.choice(quotes)
+        log.debug("Selected quote", quote=selected_quote)
+
+        # Use an embed for better formatting
+        embed = discord.Embed(
+            title="💬 Caseoh Quote",
+            description=selected_quote,
+            color=discord.Color.gold()
+        )
+        embed.set_footer(text="Inspirational wisdom from Caseoh")
+
+        await ctx.send(embed=embed, delete_after=25)
+
+    @commands.command()
+    async def joke(self, ctx):
+        """Tell a random joke"""
+        ctx.discard()
+        jokes = [
+            "Why don't scientists trust atoms? Because they make up everything!",
+            "Why did the scarecrow win an award? Because he was outstanding in his field!",
+            "Why don't skeletons fight each other? They don't have the guts.",
+            "What do you call a fake noodle? An impasta!",
+            "Why did the math book look so sad? Because it had too many problems.",
+            "How do you organize a space party? You planet!",
+            "What's the best thing about Switzerland? I don't know, but the flag is a big plus.",
+            "How does a penguin build its house? Igloos it together!",
+            "Why did the coffee file a police report? It got mugged.",
+            "What do you call a bear with no teeth? A gummy bear!"
+        ]
+        joke = random.choice(jokes)
+        await ctx.send(f"🎭 **Joke:** {joke}", delete_after=15)
+
+    @commands.command()
+    async def coinflip(self, ctx):
+        """Flip a coin"""
+        ctx.discard()
+        result = random.choice(["Heads", "Tails"])
+        await ctx.send(f"🪙 **Coin Flip:** {result}!", delete_after=10)
+
+    @commands.command()
+    async def dice(self, ctx, sides: int = 6):
+        """Roll a dice (default 6 sides)"""
+        ctx.discard()
+        if sides < 2:
+            await ctx.send("❌ The dice must have at least 2 sides.", delete_after=5)
+            return
+        roll = random.randint(1, sides)
+        await ctx.send(f"🎲 **Dice Roll ({sides} sides):** You rolled a **{roll}**!", delete_after=10)
+
+    @commands.command()
+    async def meme(self, ctx):
+        """Get a random meme"""
+        ctx.discard()
+        # List of popular meme image URLs (keep them clean and SFW)
+        memes = [
+            "https://i.imgur.com/YsDdoJv.jpeg",
+            "https://i.imgur.com/Pv4HAjO.jpeg",
+            "https://i.imgur.com/VRdTDqp.jpeg",
+            "https://i.imgur.com/D2EstGb.jpeg",
+            "https://i.imgur.com/MEu4y9G.jpeg",
+            "https://i.imgur.com/NGrYGus.jpeg",
+            "https://i.imgur.com/5nt2K2X.jpeg",
+            "https://i.imgur.com/zFNBx0E.jpeg"
+        ]
+        meme_url = random.choice(memes)
+        embed = discord.Embed(title="📸 Random Meme", color=discord.Color.random())
+        embed.set_image(url=meme_url)
+        embed.set_footer(text="Powered by imgur")
+        await ctx.send(embed=embed, delete_after=20)
+
+    @commands.command(name="CJK")
+    async def CJK(self, ctx):
+        """In remembrance of CJK"""
+        ctx.discard()
+        # List of Charlie Kirk image URLs
+        cjk_images = [
+            "https://upload.wikimedia.org/wikipedia/commons/thumb/0/03/Charlie_Kirk_%26_Donald_Trump_%2853786991842%29.jpg/960px-Charlie_Kirk_%26_Donald_Trump_%2853786991842%29.jpg",
+            "https://a57.foxnews.com/static.foxnews.com/foxnews.com/content/uploads/2025/09/1920/1080/charlie-kirk-trump-vance-campaign.jpg",
+            "https://upload.wikimedia.org/wikipedia/commons/thumb/9/95/Charlie_Kirk_%2854670963291%29.jpg/960px-Charlie_Kirk_%2854670963291%29.jpg",
+            "https://www.aljazeera.com/wp-content/uploads/2025/09/afp_68c2a997b715-1757587863.jpg"
+            # add more Charlie Kirk images here
+        ]
+
+        # Quote sayings by Charlie Kirk
+        cjk_quotes = [
+            "It’s not just intrabiblical evidence, but extrabiblical evidence that Jesus Christ was a real person. He lived a perfect life, he was crucified, died and rose on the third day, and he is Lord and God over all.",
+            "Jesus teaches us to stand firm for truth, even when it's unpopular.",
+            "Jesus defeated death so that you can live.",
+            "The Bible teaches there are only two genders, male and female, this is not a debate. We have a woke culture that is directly attacking the very created order that God established.",
+            "2 Thessalonians 3:10 says, 'If anyone is not willing to work, let him not eat.' This is the ultimate statement of personal responsibility that our welfare state has completely abandoned."
+        ]
+
+        image_url = random.choice(cjk_images)
+        quote = random.choice(cjk_quotes)
+
+        quote = f'"{quote}"'
+
+        embed = discord.Embed(
+            title="In Remembrance of Charlie Kirk 🕊️ 🇺🇸",
+            description=quote,
+            color=0x8B0000  # Dark red
+        )
+        embed.set_image(url=image_url)
+        embed.set_footer(text="Powered by Xero")
+        await ctx.send(embed=embed, delete_after=45)
+
+
+async def setup(bot):
+    await bot.add_cog(Fun(bot))
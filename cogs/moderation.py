@@ -0,0 +1,245 @@
+import datetime
+import os
+import re
+from typing import Optional
+
+import discord
+from discord.ext import commands
+
+from dispatcher import progress_message
+from gateway import LazyMember
+from logs import get_logger
+from purge import PurgeFlags, build_check, purge_channel
+
+log = get_logger("moderation")
+
+# MUTE_MODE=timeout uses Discord's native member timeout (which expires on
+# its own) instead of the Muted role
+MUTE_MODE = os.environ.get("MUTE_MODE", "role").lower()
+MAX_TIMEOUT_MINUTES = 28 * 24 * 60  # Discord's timeout limit
+
+
+class Moderation(commands.Cog):
+    """Bans, kicks, mutes, bulk actions and $purge.
+
+    Pending unmutes live in the bot's persisted timer queue (see
+    scheduler.py), so they survive restarts and reloads; this cog only
+    provides the handler that runs them. Mass actions go through the bot's
+    shared BulkDispatcher, which keeps requests in flight concurrently
+    within Discord's rate-limit buckets.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.timers = bot.timers
+        self.dispatcher = bot.dispatcher
+        # Re-registered on every (re)load so due jobs run the current code
+        self.timers.register("unmute", self.timed_unmute)
+
+    # === Advanced Moderation ===
+    @commands.command()
+    @commands.has_permissions(ban_members=True)
+    async def ban(self, ctx, member: LazyMember, *, reason="No reason provided"):
+        """Ban a member from the server"""
+        ctx.discard()
+        await member.ban(reason=reason)
+        await ctx.send(f"✅ Banned {member.mention} | Reason: {reason}", delete_after=10)
+
+    @commands.command()
+    @commands.has_permissions(ban_members=True)
+    async def unban(self, ctx, user_id: int, *, reason="No reason provided"):
+        """Unban a user by their ID"""
+        ctx.discard()
+
+        try:
+            user = await self.bot.fetch_user(user_id)
+            await ctx.guild.unban(user, reason=reason)
+            await ctx.send(f"✅ Unbanned {user.name}#{user.discriminator} | Reason: {reason}", delete_after=10)
+        except discord.NotFound:
+            await ctx.send("❌ User not found or not banned.", delete_after=7)
+        except discord.Forbidden:
+            await ctx.send("❌ I don't have permission to unban members.", delete_after=7)
+        except discord.HTTPException:
+            await ctx.send("❌ Failed to unban user. Please try again.", delete_after=7)
+
+    @commands.command()
+    @commands.has_permissions(kick_members=True)
+    async def kick(self, ctx, member: LazyMember, *, reason="No reason provided"):
+        """Kick a member from the server"""
+        ctx.discard()
+        await member.kick(reason=reason)
+        await ctx.send(f"✅ Kicked {member.mention} | Reason: {reason}", delete_after=10)
+
+    # === Timed Moderation ===
+    async def timed_unmute(self, job):
+        """Scheduled end of a role-based mute"""
+        guild = self.bot.get_guild(job["guild_id"])
+        if guild is None:
+            log.warning("⚠️ Unmute for a guild this process can't see", guild=job["guild_id"], user=job["user_id"])
+            return
+        role = guild.get_role(job["role_id"])
+        try:
+            member = guild.get_member(job["user_id"]) or await guild.fetch_member(job["user_id"])
+        except discord.NotFound:
+            return  # left the server
+        if role and role in member.roles:
+            await member.remove_roles(role, reason="Mute expired")
+
+    @commands.command()
+    @commands.has_permissions(manage_messages=True)
+    async def mute(self, ctx, member: LazyMember, duration: int = 10):
+        """Temporarily mute a member (in minutes)"""
+        ctx.discard()
+        if MUTE_MODE == "timeout":
+            duration = min(duration, MAX_TIMEOUT_MINUTES)
+            await member.timeout(datetime.timedelta(minutes=duration), reason=f"Muted by {ctx.author}")
+            await ctx.send(f"🔇 Muted {member.mention} for {duration} minutes", delete_after=10)
+            return
+
+        muted_role = discord.utils.get(ctx.guild.roles, name="Muted")
+        if not muted_role:
+            muted_role = await ctx.guild.create_role(name="Muted")
+        await self.setup_muted_role(ctx, muted_role)
+
+        await member.add_roles(muted_role)
+        await ctx.send(f"🔇 Muted {member.mention} for {duration} minutes", delete_after=10)
+
+        # Auto-unmute after duration (a re-mute replaces the previous timer)
+        await self.timers.cancel("unmute", guild_id=ctx.guild.id, user_id=member.id)
+        await self.timers.schedule("unmute", duration * 60, guild_id=ctx.guild.id, user_id=member.id,
+                                   role_id=muted_role.id)
+
+    async def setup_muted_role(self, ctx, muted_role):
+        """Deny send_messages for the Muted role in every channel that lacks it"""
+        def already_set(channel):
+            return channel.overwrites_for(muted_role).send_messages is False
+
+        channels = ctx.guild.channels
+        if all(already_set(c) for c in channels):
+            return
+        status = await ctx.send("⏳ Setting up the Muted role...")
+        # Each channel is its own rate-limit bucket, so these run side by side;
+        # channels done by an earlier, interrupted run are skipped
+        result = await self.dispatcher.run(
+            channels,
+            lambda channel: channel.set_permissions(muted_role, send_messages=False),
+            bucket=lambda channel: channel.id,
+            skip=already_set,
+            progress=progress_message(status, "Muted role setup"),
+        )
+        await status.edit(content=f"🔇 Muted role setup: {result.summary()}")
+        self.bot.cleanup.schedule(status, 10)
+
+    @commands.command()
+    @commands.has_permissions(manage_messages=True)
+    async def unmute(self, ctx, member: LazyMember):
+        """Unmute a previously muted member"""
+        ctx.discard()
+        if member.is_timed_out():
+            await member.timeout(None, reason=f"Unmuted by {ctx.author}")
+            await ctx.send(f"🔊 Unmuted {member.mention}", delete_after=10)
+            return
+
+        muted_role = discord.utils.get(ctx.guild.roles, name="Muted")
+
+        if not muted_role:
+            await ctx.send("❌ There is no Muted role in this server.", delete_after=7)
+            return
+
+        if muted_role not in member.roles:
+            await ctx.send(f"❌ {member.display_name} is not muted.", delete_after=7)
+            return
+
+        await member.remove_roles(muted_role)
+        await self.timers.cancel("unmute", guild_id=ctx.guild.id, user_id=member.id)
+        await ctx.send(f"🔊 Unmuted {member.mention}", delete_after=10)
+
+    # === Bulk Moderation ===
+    async def run_bulk(self, ctx, verb, items, action, **kwargs):
+        status = await ctx.send(f"⏳ {verb}: 0/{len(items)}")
+        result = await self.dispatcher.run(items, action, progress=progress_message(status, verb), **kwargs)
+        await status.edit(content=f"✅ {verb}: {result.summary()}")
+        self.bot.cleanup.schedule(status, 15)
+        return result
+
+    @commands.command()
+    @commands.has_permissions(ban_members=True)
+    async def massban(self, ctx, users: commands.Greedy[discord.Object], *, reason="No reason provided"):
+        """Ban several users (mentions or IDs) at once"""
+        ctx.discard()
+        if not users:
+            await ctx.send("❌ Give at least one user mention or ID.", delete_after=7)
+            return
+        await self.run_bulk(ctx, "Banning", users, lambda user: ctx.guild.ban(user, reason=reason))
+
+    @commands.command()
+    @commands.has_permissions(kick_members=True)
+    async def masskick(self, ctx, members: commands.Greedy[LazyMember], *, reason="No reason provided"):
+        """Kick several members at once"""
+        ctx.discard()
+        if not members:
+            await ctx.send("❌ Give at least one member.", delete_after=7)
+            return
+        await self.run_bulk(ctx, "Kicking", members, lambda member: member.kick(reason=reason))
+
+    @commands.command()
+    @commands.has_permissions(manage_roles=True)
+    async def massrole(self, ctx, mode: str, role: discord.Role, members: commands.Greedy[LazyMember]):
+        """Add or remove a role for several members"""
+        ctx.discard()
+        mode = mode.lower()
+        # Greedy stops quietly at the first argument it can't convert, so
+        # an empty list can mean a typo - never widen it to the whole guild
+        if mode not in ("add", "remove") or not members:
+            await ctx.send("❌ Use `$massrole add|remove @role @members...`", delete_after=7)
+            return
+        targets = members
+        if mode == "add":
+            await self.run_bulk(ctx, f"Adding {role.name}", targets, lambda member: member.add_roles(role),
+                                skip=lambda member: role in member.roles)
+        else:
+            await self.run_bulk(ctx, f"Removing {role.name}", targets, lambda member: member.remove_roles(role),
+                                skip=lambda member: role not in member.roles)
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def purge(self, ctx, amount: Optional[int] = 100, *, flags: PurgeFlags):
+        """
+        Purges messages in the current channel.
+        amount: Number of messages to delete (default 100)
+        flags: user: @user  regex: text  attachments: yes  links: yes  bots: yes
+               before: <message id>  after: <message id>  scan: <max messages to look at>
+        """
+        amount = amount or 100
+        try:
+            await ctx.message.delete()
+        except discord.NotFound:
+            pass
+        # Report a bad regex: flag before announcing (or starting) the purge
+        try:
+            check = build_check(flags)
+        except re.error as e:
+            await ctx.send(f"❌ Invalid regex: {e}", delete_after=7)
+            return
+
+        status = await ctx.send(f"☣︎ Purging up to {amount} messages...")
+
+        async def report(stats):
+            try:
+                await status.edit(content=f"☣︎ Purging... {stats.summary()}")
+            except discord.HTTPException:
+                pass
+
+        # Start just above our status message so it isn't purged mid-run
+        before = discord.Object(flags.before) if flags.before else status
+        after = discord.Object(flags.after) if flags.after else None
+        stats = await purge_channel(
+            ctx.channel, amount, check=check, before=before, after=after,
+            scan_limit=flags.scan, progress=report,
+        )
+        await status.edit(content=f"✅ Purge complete: {stats.summary()}")
+        self.bot.cleanup.schedule(status, 5)
+
+
+async def setup(bot):
+    await bot.add_cog(Moderation(bot))
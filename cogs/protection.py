@@ -0,0 +1,136 @@
+import time
+
+import discord
+from discord.ext import commands
+
+from logs import get_logger
+
+log = get_logger("protection")
+
+
+class Protection(commands.Cog):
+    """Raid lockdowns, join screening, $unlock and the $status dashboard.
+
+    Join rates are tracked per guild by the bot's RaidDetector with
+    constant-time sliding windows (see raid.py). Crossing a threshold locks
+    the guild down: highest verification level, slowmode on text channels
+    and paused invites, lifted automatically by the timer scheduler. Every
+    join is also scored by the bot's JoinScreener and suspicious accounts
+    are queued for the quarantine role (see screening.py). Needs a profile
+    with member events (INTENTS_PROFILE full or lean).
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.detector = bot.raid_detector
+        self.config = bot.raid_detector.config
+        self.stats = bot.raid_stats
+        self.timers = bot.timers
+        self.screener = bot.screener
+        self.quarantine = bot.quarantine
+        self.timers.register("lift_lockdown", self.lift_lockdown)
+        # The detector's lock state lives in memory, the lifts in the timer
+        # file: lockdowns still pending from before a restart stay in force
+        for job in self.timers.pending(action="lift_lockdown"):
+            self.detector.lock(job["guild_id"], job["due"])
+
+    # === Status Dashboard ===
+    @commands.command()
+    async def status(self, ctx):
+        ctx.discard()
+        msg = (
+            f"🛡️ **Server Health Dashboard**\n"
+            f"Raids Blocked: {self.stats['raids_blocked']}\n"
+            f"Suspicious Accounts Quarantined: {self.stats['suspicious_flagged']}"
+        )
+        await ctx.send(msg, delete_after=4)
+
+    # === Raid Protection ===
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        # Screening is pure scoring; the role itself is added later in a
+        # batch, so a join wave never waits on REST calls here
+        if self.screener is not None:
+            points, reasons = self.screener.check(member)
+            if self.screener.suspicious(points):
+                log.info("🚧 Suspicious account joined", guild=member.guild.id, user=member.id,
+                         points=points, reasons=", ".join(reasons))
+                self.quarantine.add(member)
+        if self.detector.observe(member.guild.id, time.time(), member.created_at.timestamp()):
+            self.stats["raids_blocked"] += 1
+            await self.start_lockdown(member.guild)
+
+    async def start_lockdown(self, guild):
+        """Lock a guild down and schedule the lift"""
+        if self.timers.pending(action="lift_lockdown", guild_id=guild.id):
+            # Already locked down: saving the locked settings as the ones to
+            # restore would leave the guild locked after both lifts
+            return
+        log.warning("🚨 Raid detected - locking down", guild=guild.id)
+        saved = {
+            "guild_id": guild.id,
+            "verification_level": guild.verification_level.value,
+            "invites_paused": "INVITES_DISABLED" in guild.features,
+            "slowmode": {},
+        }
+        try:
+            await guild.edit(verification_level=discord.VerificationLevel.highest,
+                             invites_disabled=True, reason="Raid lockdown")
+        except discord.HTTPException as e:
+            log.warning("⚠️ Could not raise verification level / pause invites", guild=guild.id, error=e)
+
+        channels = [c for c in guild.text_channels if c.slowmode_delay < self.config.slowmode]
+        for channel in channels:
+            saved["slowmode"][str(channel.id)] = channel.slowmode_delay
+        await self.bot.dispatcher.run(
+            channels,
+            lambda channel: channel.edit(slowmode_delay=self.config.slowmode, reason="Raid lockdown"),
+            bucket=lambda channel: channel.id,
+        )
+
+        await self.timers.schedule("lift_lockdown", self.config.lockdown_minutes * 60, **saved)
+        if guild.system_channel:
+            try:
+                await guild.system_channel.send(
+                    f"🚨 **Raid detected** - server locked down for {self.config.lockdown_minutes:g} minutes."
+                )
+            except discord.HTTPException:
+                pass
+
+    async def lift_lockdown(self, job):
+        """Scheduled (or manual) end of a raid lockdown"""
+        guild = self.bot.get_guild(job["guild_id"])
+        self.detector.release(job["guild_id"])
+        if guild is None:
+            log.warning("⚠️ Lockdown lift for a guild this process can't see", guild=job["guild_id"])
+            return
+        try:
+            await guild.edit(verification_level=discord.VerificationLevel(job["verification_level"]),
+                             invites_disabled=job["invites_paused"], reason="Raid lockdown lifted")
+        except discord.HTTPException as e:
+            log.warning("⚠️ Could not restore verification level / invites", guild=guild.id, error=e)
+        channels = [(guild.get_channel(int(cid)), delay) for cid, delay in job["slowmode"].items()]
+        await self.bot.dispatcher.run(
+            [(channel, delay) for channel, delay in channels if channel is not None],
+            lambda item: item[0].edit(slowmode_delay=item[1], reason="Raid lockdown lifted"),
+            bucket=lambda item: item[0].id,
+        )
+        log.info("🟢 Lockdown lifted", guild=guild.id)
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def unlock(self, ctx):
+        """Lift an active raid lockdown now"""
+        ctx.discard()
+        jobs = self.timers.pending(action="lift_lockdown", guild_id=ctx.guild.id)
+        if not jobs:
+            await ctx.send("❌ This server is not locked down.", delete_after=7)
+            return
+        await self.timers.cancel("lift_lockdown", guild_id=ctx.guild.id)
+        for job in jobs:
+            await self.lift_lockdown(job)
+        await ctx.send("🔓 Lockdown lifted.", delete_after=10)
+
+
+async def setup(bot):
+    await bot.add_cog(Protection(bot))
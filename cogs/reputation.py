@@ -0,0 +1,208 @@
+import asyncio
+
+import discord
+from discord.ext import commands
+
+from backfill import BackfillCheckpoint, backfill_from_env, checkpoint_path
+from gateway import LazyMember
+from logs import get_logger
+from reputation import GuildConfig
+
+log = get_logger("reputation")
+
+# Per-guild reputation rules; changes are saved and take effect at once
+REPCONFIG_SETTINGS = [name for name in GuildConfig.DEFAULTS if name != "ignored_channels"]
+
+
+class Reputation(commands.Cog):
+    """$rep, $top, $repconfig, $save and $backfill over the bot's ReputationService"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.service = bot.reputation
+
+    # Command to check reputation
+    @commands.command()
+    @commands.guild_only()
+    async def rep(self, ctx, member: LazyMember = None):
+        ctx.discard()
+        member = member or ctx.author
+        score = self.service.score(ctx.guild.id, member.id)
+        # Off the loop: the first ranking of a guild builds its index
+        place, total = await asyncio.to_thread(self.service.rank, ctx.guild.id, member.id)
+        rank_text = f" (#{place:,} of {total:,})" if place else ""
+        await ctx.send(f"📊 **Reputation for {member.display_name}:** {score}{rank_text}", delete_after=7)
+
+    # Leaderboard straight from the ranking index (no sorting of all users)
+    @commands.command()
+    @commands.guild_only()
+    async def top(self, ctx, count: int = 10, page: int = 1):
+        """Show the reputation leaderboard"""
+        ctx.discard()
+        count = min(max(count, 1), 25)
+        page = max(page, 1)
+        entries = await asyncio.to_thread(self.service.top, ctx.guild.id, count, (page - 1) * count)
+        if not entries:
+            await ctx.send("❌ Nobody on that page yet.", delete_after=7)
+            return
+        start = (page - 1) * count
+        lines = [f"**#{start + i}** <@{user_id}> - {score}" for i, (user_id, score) in enumerate(entries, start=1)]
+        embed = discord.Embed(title="🏆 Reputation Leaderboard", description="\n".join(lines),
+                              color=discord.Color.gold())
+        embed.set_footer(text=f"Page {page} • $top [count] [page]")
+        await ctx.send(embed=embed, delete_after=30)
+
+    @commands.command()
+    @commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    async def repconfig(self, ctx, setting: str = None, *, value: str = None):
+        """View or change this server's reputation rules"""
+        ctx.discard()
+        try:
+            if setting in ("ignore", "unignore") and value:
+                channel = await commands.TextChannelConverter().convert(ctx, value)
+                ignored = set(self.service.config(ctx.guild.id).ignored_channels)
+                if setting == "ignore":
+                    ignored.add(channel.id)
+                else:
+                    ignored.discard(channel.id)
+                await asyncio.to_thread(self.service.set_config, ctx.guild.id, ignored_channels=ignored)
+            elif setting in REPCONFIG_SETTINGS and value:
+                await asyncio.to_thread(self.service.set_config, ctx.guild.id, **{setting: int(value)})
+            elif setting is not None:
+                await ctx.send(f"❌ Usage: `$repconfig [{'|'.join(REPCONFIG_SETTINGS)}] [value]` "
+                               "or `$repconfig ignore|unignore #channel`", delete_after=10)
+                return
+        except (ValueError, commands.BadArgument) as e:
+            await ctx.send(f"❌ {e}", delete_after=7)
+            return
+
+        config = self.service.config(ctx.guild.id)
+        embed = discord.Embed(title="📊 Reputation Settings", color=discord.Color.blurple())
+        for name in REPCONFIG_SETTINGS:
+            embed.add_field(name=name, value=getattr(config, name), inline=True)
+        ignored = " ".join(f"<#{channel_id}>" for channel_id in sorted(config.ignored_channels))
+        embed.add_field(name="ignored_channels", value=ignored or "None", inline=False)
+        await ctx.send(embed=embed, delete_after=30)
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def save(self, ctx):
+        """Manually save all reputation data to prevent data loss"""
+        await asyncio.to_thread(self.service.flush, True)
+        await ctx.send("💾 All reputation data saved!", delete_after=3)
+        ctx.discard()
+
+    # Seed scores from messages sent before the bot was counting (see
+    # backfill.py). Runs in the background; rerunning after an interruption
+    # resumes from the checkpoint.
+    @commands.command()
+    @commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    async def backfill(self, ctx, action: str = "start", confirm: str = None):
+        """Seed reputation from message history (start|all|status|cancel)"""
+        ctx.discard()
+        action = action.lower()
+        starting = ctx.guild.id in self.bot.backfills
+        job = self.bot.backfills.get(ctx.guild.id)
+        if action == "status":
+            if job is not None:
+                text = f"📜 Backfill running: {job.summary()}"
+            else:
+                text = "📜 Backfill starting." if starting else "📜 No backfill running."
+            await ctx.send(text, delete_after=10)
+            return
+        if action == "cancel":
+            if job is None:
+                text = "❌ The backfill is still starting." if starting else "❌ No backfill running."
+                await ctx.send(text, delete_after=7)
+                return
+            job.task.cancel()
+            await ctx.send("⏹️ Stopping backfill (progress is kept).", delete_after=7)
+            return
+        if action not in ("start", "all"):
+            await ctx.send("❌ Usage: `$backfill [all confirm|status|cancel]`", delete_after=7)
+            return
+        if starting:
+            await ctx.send("❌ A backfill is already running here.", delete_after=7)
+            return
+        if action == "all" and (confirm or "").lower() != "confirm":
+            # Points are added to what's stored, so recounting on top of
+            # scores that weren't lost would double them
+            await ctx.send("⚠️ `$backfill all` deletes every reputation score in this server and "
+                           "rebuilds them from the whole message history. Run `$backfill all confirm` "
+                           "to go ahead.", delete_after=20)
+            return
+        # Claim the guild before the first await, so a second $backfill
+        # can't start another run over the same history meanwhile
+        self.bot.backfills[ctx.guild.id] = None
+        try:
+            await self._start_backfill(ctx, action)
+        finally:
+            if self.bot.backfills.get(ctx.guild.id) is None:
+                self.bot.backfills.pop(ctx.guild.id, None)
+
+    async def _start_backfill(self, ctx, action):
+        path = checkpoint_path(ctx.guild.id)
+        if action == "all":
+            # A full recount replaces the scores: whatever is stored, and
+            # whatever an earlier run got through, no longer applies
+            await asyncio.to_thread(self.service.clear, ctx.guild.id)
+            log.warning("📜 Reputation cleared for a full backfill", guild=ctx.guild.id, by=ctx.author.id)
+            checkpoint = None
+        else:
+            checkpoint = await asyncio.to_thread(BackfillCheckpoint.load, path)
+        if checkpoint is not None and checkpoint.finished:
+            await ctx.send("❌ This server's history has already been backfilled. "
+                           "`$backfill all` rebuilds every score from scratch.", delete_after=10)
+            return
+        if checkpoint is None:
+            # Messages since the bot joined were counted live; `all` starts
+            # from empty scores, so it counts those as well
+            since = ctx.guild.me.joined_at if action == "start" else None
+            checkpoint = BackfillCheckpoint(path, discord.utils.time_snowflake(since or discord.utils.utcnow()))
+        job = backfill_from_env(self.service, ctx.guild, checkpoint)
+        if action == "all":
+            # Replace any old checkpoint now, so a crash before the first
+            # batch can't resume it on top of the cleared scores
+            await asyncio.to_thread(checkpoint.save)
+            await ctx.send("♻️ Scores cleared; recounting the whole message history.", delete_after=15)
+        status = await ctx.send("⏳ Backfilling reputation...")
+        job.task = asyncio.create_task(self._run_backfill(job, status))
+        self.bot.backfills[ctx.guild.id] = job
+
+    async def _run_backfill(self, job, status):
+        async def progress(job):
+            await status.edit(content=f"⏳ Backfilling reputation... {job.summary()}")
+
+        guild_id = job.guild.id
+        log.info("📜 Backfill started", guild=guild_id, resumed_at=job.scanned)
+        try:
+            result = await job.run(progress)
+        except asyncio.CancelledError:
+            text = f"⏹️ Backfill stopped: {job.summary()}. `$backfill` resumes it."
+            log.info("📜 Backfill stopped", guild=guild_id, messages=job.scanned)
+        except Exception:
+            text = f"❌ Backfill failed: {job.summary()}. `$backfill` resumes it."
+            log.exception("Backfill failed", guild=guild_id)
+        else:
+            text = f"✅ Backfill complete: {job.summary()}"
+            if result.failed:
+                text += f" ({len(result.failed)} channels failed - `$backfill` retries them)"
+            log.info("📜 Backfill finished", guild=guild_id, messages=job.scanned, failed=len(result.failed))
+        finally:
+            self.bot.backfills.pop(guild_id, None)
+        try:
+            await status.edit(content=text)
+            self.bot.cleanup.schedule(status, 30)
+        except discord.HTTPException:
+            pass
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        # Save and unload the guild's scores; they load again if we're re-added
+        await asyncio.to_thread(self.service.evict, guild.id)
+
+
+async def setup(bot):
+    await bot.add_cog(Reputation(bot))
@@ -0,0 +1,200 @@
+import importlib
+import itertools
+
+import discord
+from discord.ext import commands
+
+import help_pages
+from gateway import LazyMember
+
+# $cmds pages and the guide are built in help_pages.py; re-running it here
+# means `$reload utility` picks up edits to the pages as well
+importlib.reload(help_pages)
+
+# List of statuses for embeds / manual selection
+statuses_list = [
+    discord.Streaming(name="$", url="https://www.twitch.tv/error"),
+    discord.Activity(type=discord.ActivityType.watching, name="Servers"),
+]
+
+
+class Utility(commands.Cog):
+    """Info, help, presence and $perf commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        # Cycle through statuses automatically
+        self.statuses = itertools.cycle(statuses_list)
+
+    # === Ping & XERO Commands ===
+    @commands.command()
+    async def ping(self, ctx):
+        ctx.discard()
+        await ctx.send("I'm still awake and watching servers.", delete_after=4)
+
+    @commands.command()
+    async def x(self, ctx):
+        ctx.discard()
+        message = (
+            "🛡️ **𝘟 𝘎𝘶𝘢𝘳𝘥 𝘗𝘳𝘰𝘵𝘦𝘤𝘵𝘪𝘰𝘯 𝘚𝘺𝘴𝘵𝘦𝘮**\n"
+            "DDoS Protection Activated ✅\n"
+            "All servers are safe and monitored."
+        )
+        await ctx.send(message, delete_after=4)
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def perf(self, ctx, count: int = 8):
+        """Show the slowest commands and events"""
+        ctx.discard()
+        metrics = self.bot.metrics
+        loop_monitor = self.bot.loop_monitor
+
+        def rows(histograms, errors):
+            ranked = sorted(histograms.items(), key=lambda item: item[1].quantile(0.99), reverse=True)
+            return "\n".join(
+                f"`{name}` n={h.count} avg={h.mean * 1000:.1f}ms p99≤{h.quantile(0.99) * 1000:.0f}ms"
+                + (f" err={errors[name]}" if errors.get(name) else "")
+                + (f" rest={metrics.rest_calls[name]}" if metrics.rest_calls.get(name) else "")
+                for name, h in ranked[:count]
+            ) or "No data yet"
+
+        embed = discord.Embed(title="⏱️ Performance", color=discord.Color.blurple())
+        embed.add_field(name="Commands", value=rows(metrics.commands, metrics.command_errors), inline=False)
+        embed.add_field(name="Events", value=rows(metrics.events, metrics.event_errors), inline=False)
+        embed.add_field(
+            name="Event Loop",
+            value=(f"lag {loop_monitor.lag * 1000:.1f}ms (max {loop_monitor.max_lag * 1000:.0f}ms), "
+                   f"{metrics.slow_callbacks} blocking stalls"),
+            inline=False,
+        )
+        await ctx.send(embed=embed, delete_after=60)
+
+    # Command to show  two statuses in an embed
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def presence(self, ctx):
+        ctx.discard()
+        embed = discord.Embed(
+            title="Presence Manager",
+            description="Select a status to set",
+            color=discord.Color.blurple()
+        )
+
+        # Show statuses without URL in the embed
+        for i, s in enumerate(statuses_list, start=1):
+            if isinstance(s, discord.Streaming):
+                type_name = "Streaming"
+                value = s.name  # just show the name, hide URL
+            else:
+                type_name = s.type.name.capitalize()
+                value = s.name
+            embed.add_field(name=f"{i}. {type_name}", value=value, inline=False)
+
+        embed.set_footer(text="Use $setstatus <number> to change status.")
+        await ctx.send(embed=embed, delete_after=10)
+
+    @commands.command()
+    @commands.guild_only()
+    async def user(self, ctx, member: LazyMember = None):
+        """Display user information"""
+        member = member or ctx.author
+        ctx.discard()
+
+        # Calculate account age
+        account_age = (ctx.message.created_at - member.created_at).days
+        # Calculate server join age
+        join_age = (ctx.message.created_at - member.joined_at).days if member.joined_at else 0
+
+        # Get user status (only tracked when presences are enabled)
+        if not self.bot.intents.presences:
+            status = "Unknown"
+            activity = "Unknown"
+        else:
+            status = str(member.status).capitalize()
+            if member.activity:
+                activity = f"Playing {member.activity.name}"
+            else:
+                activity = "No activity"
+
+        # Get user roles (excluding @everyone)
+        roles = [role.mention for role in member.roles if role.name != "@everyone"]
+        if not roles:
+            roles = ["No roles"]
+
+        # Create embed
+        embed = discord.Embed(
+            title=f"👤 User Information - {member.display_name}",
+            color=member.color
+        )
+
+        # Add fields
+        embed.add_field(name="📛 Username", value=f"{member.name}#{member.discriminator}", inline=True)
+        embed.add_field(name="🆔 User ID", value=member.id, inline=True)
+        embed.add_field(name="📊 Reputation", value=self.bot.reputation.score(ctx.guild.id, member.id), inline=True)
+
+        embed.add_field(name="📅 Account Created", value=f"{member.created_at.strftime('%b %d, %Y')}\n({account_age} days ago)", inline=True)
+
+        if member.joined_at:
+            embed.add_field(name="📥 Joined Server", value=f"{member.joined_at.strftime('%b %d, %Y')}\n({join_age} days ago)", inline=True)
+        else:
+            embed.add_field(name="📥 Joined Server", value="Unknown", inline=True)
+
+        embed.add_field(name="🎭 Highest Role", value=member.top_role.mention, inline=True)
+
+        embed.add_field(name="🟢 Status", value=status, inline=True)
+        embed.add_field(name="🎮 Activity", value=activity, inline=True)
+        embed.add_field(name="📋 Roles", value=" ".join(roles[:3]) + (f" (+{len(roles)-3} more)" if len(roles) > 3 else ""), inline=False)
+
+        # Add avatar thumbnail
+        if member.avatar:
+            embed.set_thumbnail(url=member.avatar.url)
+
+        embed.set_footer(text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.avatar.url if ctx.author.avatar else None)
+
+        await ctx.send(embed=embed, delete_after=30)
+
+    # Command to manually set a status by number
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def setstatus(self, ctx, number: int):
+        ctx.discard()
+        if 1 <= number <= len(statuses_list):
+            activity = statuses_list[number - 1]
+            await self.bot.change_presence(activity=activity)
+            await ctx.send(
+                f"✅ Status changed to: **{getattr(activity, 'name', 'Unknown')}**",
+                delete_after=7  # <-- deletes after 7 seconds
+            )
+
+            # Reset the cycle so the next automatic update continues from the next status
+            new_order = statuses_list[number:] + statuses_list[:number-1]
+            self.statuses = itertools.cycle(new_order)
+
+        else:
+            await ctx.send(
+                "❌ Invalid status number.",
+                delete_after=7  # <-- also deletes after 7 seconds
+            )
+
+    @commands.command()
+    async def guide(self, ctx):
+        """Get detailed information about the bot's systems"""
+        ctx.discard()
+        await ctx.send(embed=help_pages.GUIDE_EMBED)
+
+    @commands.command(name="cmds")
+    async def cmds_list(self, ctx, page: int = 1):
+        ctx.discard()
+
+        # Validate page number
+        if page < 1 or page > len(help_pages.HELP_PAGES):
+            page = 1
+
+        # Pages are pre-built; the buttons edit this one message in place
+        view = help_pages.HelpView(ctx.author, ctx.guild, page)
+        view.message = await ctx.send(embed=view.current_embed(), view=view)
+
+
+async def setup(bot):
+    await bot.add_cog(Utility(bot))
@@ -0,0 +1,232 @@
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+
+# === Columnar Reputation Rows ===
+_HASH = 0x9E3779B97F4A7C15     # Fibonacci hashing multiplier (2**64 / golden ratio)
+_MASK64 = (1 << 64) - 1
+_NEVER = math.nan               # last_active for users with no recorded activity
+
+# Snapshot file: header, then the ids, last_active, scores and index
+# columns back to back as raw machine values
+_MAGIC = b"XREP"
+_VERSION = 1
+_HEADER = struct.Struct("<4sH?xQQ")   # magic, version, little-endian, rows, index size
+
+
+class ColumnarRows:
+    """One guild's ``user_id -> (score, last_active)`` rows as packed columns.
+
+    ``ids`` (int64), ``last_active`` (float64, NaN for none) and ``scores``
+    (int32) hold one user per slot in arrival order; ``table`` is an
+    open-addressing hash index from user id to slot (-1 for empty), kept
+    at most half full. There is no Python object per user, so a row costs
+    about 36 bytes instead of the ~200 of two dicts, and saving or loading
+    a guild is a handful of memcpys (see write() and read()).
+    """
+
+    __slots__ = ("ids", "last_active", "scores", "table", "_shift")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.last_active = array("d")
+        self.scores = array("i")
+        self._index(8)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Columns from a ``{user_id: (score, last_active)}`` dict"""
+        columns = cls()
+        columns.ids = array("q", rows)
+        columns.scores = array("i", (score for score, _ in rows.values()))
+        columns.last_active = array("d", (_NEVER if active is None else active for _, active in rows.values()))
+        columns._index(len(columns.ids) * 2)
+        return columns
+
+    def _index(self, size):
+        """Rebuild the hash index with room for ``size`` entries (rounded up to a power of two)"""
+        bits = max(size - 1, 7).bit_length()
+        self.table = table = array("i", [-1]) * (1 << bits)
+        self._shift = 64 - bits
+        mask = len(table) - 1
+        shift = self._shift
+        for slot, user_id in enumerate(self.ids):
+            i = ((user_id * _HASH) & _MASK64) >> shift
+            while table[i] >= 0:
+                i = (i + 1) & mask
+            table[i] = slot
+
+    def _probe(self, user_id):
+        """``(index position, slot)`` for a user; slot is -1 if they aren't stored"""
+        table = self.table
+        ids = self.ids
+        mask = len(table) - 1
+        i = ((user_id * _HASH) & _MASK64) >> self._shift
+        while True:
+            slot = table[i]
+            if slot < 0 or ids[slot] == user_id:
+                return i, slot
+            i = (i + 1) & mask
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, user_id):
+        return self._probe(user_id)[1] >= 0
+
+    def get(self, user_id):
+        """``(score, last_active)`` or None"""
+        slot = self._probe(user_id)[1]
+        if slot < 0:
+            return None
+        active = self.last_active[slot]
+        return self.scores[slot], (None if active != active else active)
+
+    def set(self, user_id, score, last_active=None):
+        """Store a score; ``last_active=None`` keeps the previous timestamp"""
+        i, slot = self._probe(user_id)
+        if slot >= 0:
+            self.scores[slot] = score
+            if last_active is not None:
+                self.last_active[slot] = last_active
+            return
+        self.table[i] = len(self.ids)
+        self.ids.append(user_id)
+        self.scores.append(score)
+        self.last_active.append(_NEVER if last_active is None else last_active)
+        if len(self.ids) * 2 > len(self.table):
+            self._index(len(self.table) * 2)
+
+    def items(self):
+        """``(user_id, (score, last_active))`` for every row, in slot order"""
+        for user_id, score, active in zip(self.ids, self.scores, self.last_active):
+            yield user_id, (score, None if active != active else active)
+
+    def select(self, user_ids):
+        """``{user_id: (score, last_active)}`` for the given (stored) users"""
+        return {user_id: self.get(user_id) for user_id in user_ids}
+
+    def copy(self):
+        columns = ColumnarRows.__new__(ColumnarRows)
+        columns.ids = self.ids[:]
+        columns.last_active = self.last_active[:]
+        columns.scores = self.scores[:]
+        columns.table = self.table[:]
+        columns._shift = self._shift
+        return columns
+
+    # --- binary snapshot ---
+    def write(self, path):
+        """Save as a snapshot file (temp file swapped in atomically)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, sys.byteorder == "little", len(self.ids), len(self.table)))
+            for column in (self.ids, self.last_active, self.scores, self.table):
+                column.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def read(cls, path):
+        """Load a snapshot by memory-mapping it and copying each column out whole"""
+        columns = cls.__new__(cls)
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"Truncated reputation snapshot: {path}")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                magic, version, little, count, table_size = _HEADER.unpack_from(view)
+                if magic != _MAGIC or version != _VERSION:
+                    raise ValueError(f"Not a reputation snapshot: {path}")
+                layout = (("q", count), ("d", count), ("i", count), ("i", table_size))
+                if size != _HEADER.size + sum(array(t).itemsize * n for t, n in layout):
+                    raise ValueError(f"Truncated reputation snapshot: {path}")
+                offset = _HEADER.size
+                loaded = []
+                for typecode, length in layout:
+                    column = array(typecode)
+                    end = offset + length * column.itemsize
+                    column.frombytes(view[offset:end])
+                    if little != (sys.byteorder == "little"):
+                        column.byteswap()
+                    loaded.append(column)
+                    offset = end
+        columns.ids, columns.last_active, columns.scores, columns.table = loaded
+        columns._shift = 64 - (table_size.bit_length() - 1)
+        return columns
+
+
+if __name__ == "__main__":
+    # python columns.py [users] - dicts vs columns for one big guild
+    import gc
+    import random
+    import tempfile
+    import tracemalloc
+
+    from storage import JsonBackend
+
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(0)
+    now = time.time()
+    # Most users were last seen hours ago, a long tail days or weeks ago
+    rows = {
+        (1 << 60) + rng.getrandbits(56): (rng.randint(100, 1000), now - rng.expovariate(1 / 21600))
+        for _ in range(users)
+    }
+
+    def dicts(rows):
+        # The previous in-memory layout: two dicts per guild
+        scores, last_active = {}, {}
+        for uid, (score, active) in rows.items():
+            scores[uid] = score
+            last_active[uid] = active
+        return scores, last_active
+
+    def traced(build):
+        gc.collect()
+        tracemalloc.start()
+        value = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return value, size
+
+    directory = tempfile.mkdtemp(prefix="xguard-columns-")
+    backend = JsonBackend(directory, legacy_path=None)
+    backend.save(1, rows)
+    snapshot = os.path.join(directory, "1.rep")
+    ColumnarRows.from_rows(rows).write(snapshot)
+    del rows
+
+    # Memory a loaded guild keeps, ids and values included
+    (scores, last_active), dict_bytes = traced(lambda: dicts(backend.load_guild(1)))
+    columns, column_bytes = traced(lambda: ColumnarRows.read(snapshot))
+    print(f"🧮 {users:,} users: dicts {dict_bytes / users:.0f} B/user, "
+          f"columns {column_bytes / users:.0f} B/user ({dict_bytes / column_bytes:.1f}x smaller)")
+    del scores, last_active
+    gc.collect()
+    started = time.perf_counter()
+    scores, last_active = dicts(backend.load_guild(1))
+    json_load = time.perf_counter() - started
+    started = time.perf_counter()
+    ColumnarRows.read(snapshot)
+    snapshot_load = time.perf_counter() - started
+    json_mb = os.path.getsize(os.path.join(directory, "1.json")) / 1e6
+    print(f"💾 load: JSON {json_load:.2f}s ({json_mb:.0f} MB), snapshot {snapshot_load * 1000:.1f}ms "
+          f"({os.path.getsize(snapshot) / 1e6:.0f} MB) - {json_load / snapshot_load:.0f}x faster")
+
+    sample = rng.sample(list(scores), 100_000)
+    started = time.perf_counter()
+    for uid in sample:
+        scores.get(uid)
+    dict_get = (time.perf_counter() - started) / len(sample)
+    started = time.perf_counter()
+    for uid in sample:
+        columns.get(uid)
+    column_get = (time.perf_counter() - started) / len(sample)
+    print(f"🔎 lookup: dicts {dict_get * 1e6:.2f}µs, columns {column_get * 1e6:.2f}µs")
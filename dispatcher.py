@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import discord
+
+
+# === Bulk REST Dispatcher ===
+class BulkResult:
+    """Outcome of one bulk run"""
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.skipped = 0
+        self.failed = []    # (item, error) pairs
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def summary(self):
+        parts = [f"{self.done}/{self.total} done"]
+        if self.skipped:
+            parts.append(f"{self.skipped} already done")
+        if self.failed:
+            parts.append(f"{len(self.failed)} failed")
+        return ", ".join(parts) + f" in {self.elapsed:.1f}s"
+
+
+class BulkDispatcher:
+    """Runs many guild REST calls concurrently.
+
+    discord.py already waits out 429s per route, but it can only do that
+    for requests we actually have in flight. The dispatcher keeps a bounded
+    number of calls running overall and per rate-limit bucket (e.g. one
+    bucket per channel for permission overwrites, one per guild for bans),
+    retries transient failures and reports progress as it goes.
+    """
+
+    def __init__(self, concurrency=16, per_bucket=4, retries=3, progress_interval=2.0):
+        self.concurrency = concurrency
+        self.per_bucket = per_bucket
+        self.retries = retries
+        self.progress_interval = progress_interval
+
+    async def run(self, items, action, bucket=None, skip=None, progress=None):
+        """Call ``await action(item)`` for every item.
+
+        ``bucket(item)`` names the rate-limit bucket the call lands in,
+        ``skip(item)`` returns True for work that is already done (so a
+        rerun after a failure resumes instead of starting over) and
+        ``await progress(result)`` is called at most every
+        ``progress_interval`` seconds.
+        """
+        items = list(items)
+        result = BulkResult(len(items))
+        overall = asyncio.Semaphore(self.concurrency)
+        buckets = {}
+        last_report = time.perf_counter()
+
+        async def report(force=False):
+            nonlocal last_report
+            now = time.perf_counter()
+            if progress and (force or now - last_report >= self.progress_interval):
+                last_report = now
+                result.elapsed = now - result.started
+                try:
+                    await progress(result)
+                except discord.HTTPException:
+                    pass  # progress is best-effort
+
+        async def worker(item):
+            if skip and skip(item):
+                result.skipped += 1
+                return
+            key = bucket(item) if bucket else None
+            limit = buckets.setdefault(key, asyncio.Semaphore(self.per_bucket))
+            async with overall, limit:
+                error = await self._attempt(action, item)
+            if error is None:
+                result.done += 1
+            else:
+                result.failed.append((item, error))
+            await report()
+
+        await asyncio.gather(*(worker(item) for item in items))
+        result.elapsed = time.perf_counter() - result.started
+        await report(force=True)
+        return result
+
+    async def _attempt(self, action, item):
+        for attempt in range(self.retries + 1):
+            try:
+                await action(item)
+                return None
+            except (discord.Forbidden, discord.NotFound) as e:
+                return e  # retrying won't help
+            except discord.HTTPException as e:
+                if attempt == self.retries or (e.status < 500 and e.status != 429):
+                    return e
+            except (asyncio.TimeoutError, OSError) as e:
+                if attempt == self.retries:
+                    return e
+            await asyncio.sleep(min(2 ** attempt, 10))
+
+
+def progress_message(message, verb):
+    """Progress callback that edits ``message`` in place"""
+    async def update(result):
+        finished = result.done + result.skipped + len(result.failed)
+        await message.edit(content=f"⏳ {verb}: {finished}/{result.total} ({result.summary()})")
+    return update
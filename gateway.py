@@ -0,0 +1,159 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+import discord
+from discord.ext import commands
+
+
+# === Gateway Intent / Member Cache Profiles ===
+# full:    everything cached up front (the original behaviour)
+# lean:    member join/leave events, but no presences and no startup chunking;
+#          members are cached as they show up and fetched on demand otherwise
+# minimal: only guild, message and reaction events; no member cache at all
+PROFILES = ("full", "lean", "minimal")
+
+
+def gateway_options(profile=None):
+    """Keyword arguments for commands.Bot for an INTENTS_PROFILE"""
+    profile = (profile or os.environ.get("INTENTS_PROFILE", "full")).lower()
+    if profile == "full":
+        intents = discord.Intents.all()
+        intents.message_content = True
+        return {"intents": intents}
+
+    if profile == "lean":
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.members = True
+        intents.presences = False
+        intents.typing = False
+        return {
+            "intents": intents,
+            "member_cache_flags": discord.MemberCacheFlags.from_intents(intents),
+            "chunk_guilds_at_startup": False,
+        }
+
+    if profile == "minimal":
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.guild_messages = True
+        intents.guild_reactions = True
+        intents.message_content = True
+        return {
+            "intents": intents,
+            "member_cache_flags": discord.MemberCacheFlags.none(),
+            "chunk_guilds_at_startup": False,
+        }
+
+    raise ValueError(f"Unknown INTENTS_PROFILE: {profile}")
+
+
+# === On-Demand Member Lookup ===
+_ID_RE = re.compile(r"<@!?([0-9]{15,20})>$|([0-9]{15,20})$")
+
+
+class LazyMember(commands.Converter):
+    """Member converter that falls back to an HTTP fetch.
+
+    With a lean or minimal profile most members are not cached and the
+    gateway member query may be unavailable, so mentions and raw IDs are
+    resolved with a single fetch_member call instead.
+    """
+
+    async def convert(self, ctx, argument):
+        try:
+            return await commands.MemberConverter().convert(ctx, argument)
+        except (commands.MemberNotFound, discord.ClientException):
+            match = _ID_RE.match(argument)
+            if not match or ctx.guild is None:
+                raise commands.MemberNotFound(argument)
+            try:
+                return await ctx.guild.fetch_member(int(match.group(1) or match.group(2)))
+            except discord.HTTPException:
+                raise commands.MemberNotFound(argument)
+
+
+# === Startup Measurement ===
+def rss_mb():
+    """Current resident set size in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        import resource
+        # ru_maxrss is KB on Linux (peak rather than current)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def startup_report(bot, started_at, profile, phases=None):
+    """One-line JSON summary printed by main.py when MEASURE_STARTUP=1.
+
+    ``phases`` maps a startup phase (imports, login, ready) to the
+    perf_counter() value when it ended.
+    """
+    report = {"profile": profile}
+    for phase, ended_at in (phases or {}).items():
+        report[f"{phase}_seconds"] = round(ended_at - started_at, 3)
+    report.setdefault("ready_seconds", round(time.perf_counter() - started_at, 2))
+    report.update({
+        "rss_mb": round(rss_mb(), 1),
+        "guilds": len(bot.guilds),
+        "cached_members": sum(len(g.members) for g in bot.guilds),
+    })
+    return json.dumps(report)
+
+
+def import_times(importtime_output, top=15):
+    """Slowest top-level imports (cumulative ms) from ``python -X importtime`` output"""
+    modules = {}
+    for line in importtime_output.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or len(parts) != 3:
+            continue
+        try:
+            cumulative = int(parts[1])
+        except ValueError:
+            continue  # header line
+        name = parts[2][1:]
+        if not name.startswith(" "):  # nested imports are inside their parent's time
+            modules[name] = modules.get(name, 0) + cumulative
+    ranked = sorted(modules.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "total_ms": round(sum(modules.values()) / 1000, 1),
+        "slowest_ms": {name: round(us / 1000, 1) for name, us in ranked[:top]},
+    }
+
+
+def measure_profiles(profiles=PROFILES, script="main.py"):
+    """Start the bot once per profile and collect its startup report.
+
+    Each run also records per-module import times, so those are reported
+    even when the bot can't log in (no TOKEN).
+    """
+    results = []
+    for profile in profiles:
+        env = dict(os.environ, INTENTS_PROFILE=profile, MEASURE_STARTUP="1")
+        proc = subprocess.run([sys.executable, "-X", "importtime", script],
+                              env=env, capture_output=True, text=True, timeout=600)
+        for line in proc.stdout.splitlines():
+            if line.startswith("📏 "):
+                result = json.loads(line[2:])
+                break
+        else:
+            errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+            lines = [line for line in proc.stdout.splitlines() if line.strip()]
+            result = {"profile": profile, "error": (errors or lines)[-1:] or "no report"}
+        result["imports"] = import_times(proc.stderr)
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    # python gateway.py [profile ...]
+    for result in measure_profiles(sys.argv[1:] or PROFILES):
+        print(json.dumps(result))
@@ -0,0 +1,217 @@
+import discord
+
+
+# === Cached Help Pages ===
+# Built once at startup; $cmds and $guide only ever copy or send these.
+HELP_PAGES = [
+    {
+        "title": "𝘎𝘦𝘯𝘦𝘳𝘢𝘭 𝘊𝘰𝘮𝘮𝘢𝘯𝘥𝘴",
+        "description": "",
+        "fields": [
+            ("⛉ $x", "Shows DDoS protection status", False),
+            ("✦ $rep [user]", "View your reputation or members", False),
+            ("🏆 $top [count] [page]", "Reputation leaderboard", False),
+            ("✚ $status", "Server health dashboard", False),
+            ("🛈 $guide", "System Help Guide", False),
+            ("𝗓𐰁 $ping", "Check if the bot is awake", False),
+            ("★ $user [user]", "View user details", False),
+            ("☰ $cmds", "Displays this command list", False),
+        ]
+    },
+    {
+        "title": "𝘌𝘯𝘵𝘦𝘳𝘵𝘢𝘪𝘯𝘮𝘦𝘯𝘵 𝘊𝘰𝘮𝘮𝘢𝘯𝘥𝘴",
+        "description": "",
+        "fields": [
+            ("🎭 $joke", "Tell a random joke", False),
+            ("🪙 $coinflip", "Flip a coin", False),
+            ("🎲 $dice [sides]", "Roll a dice (default 6 sides)", False),
+            ("📸 $meme", "Get a random meme", False),
+            ("🎵 $play <song or URL>", "Play music in your voice channel (if enabled)", False),
+            ("⏭️ $skip / ⏹️ $stop", "Skip the song / stop and leave", False),
+            ("🎶 $queue", "Show the song queue", False),
+        ]
+    },
+    {
+        "title": "🔒 ADMIN ONLY COMMANDS",
+        "description": "",
+        "fields": [
+            ("✗ $presence", "View 𝘟 𝘎𝘶𝘢𝘳𝘥 status", False),
+            ("⚙️ $setstatus [number]", "Set 𝘟 𝘎𝘶𝘢𝘳𝘥 status", False),
+            ("☣︎ $purge [amount] [filters]", "Purge messages (user: regex: links: bots: ...)", False),
+            ("🛡️ $ban @user [reason]", "Ban a member", False),
+            ("🛡️ $unban [userID] [reason]", "Unban a user by their ID", False),
+            ("👢 $kick @user [reason]", "Kick a member", False),
+            ("🔇 $mute @user [minutes]", "Temporarily mute a member", False),
+            ("🔊 $unmute @user", "Unmute a muted member", False),
+            ("🛡️ $massban [users...] [reason]", "Ban several users at once", False),
+            ("👢 $masskick @users... [reason]", "Kick several members at once", False),
+            ("🎭 $massrole add|remove @role @users...", "Change a role for many members", False),
+            ("🔓 $unlock", "Lift a raid lockdown early", False),
+            ("⏱️ $perf", "Command/event latency and loop lag", False),
+            ("📊 $repconfig [setting] [value]", "View or change this server's reputation rules", False),
+            ("💾 $save", "Manually save reputation data (optional)", False),
+            ("📜 $backfill [all confirm|status|cancel]", "Seed reputation from message history (all: rebuild every score)", False),
+            ("🔁 $reload [module...]", "Reload command modules without reconnecting (bot owner)", False),
+        ]
+    }
+]
+
+
+def _build_page(number, page, admin_note=False):
+    embed = discord.Embed(
+        title=page["title"],
+        description=page["description"],
+        color=discord.Color.blurple()
+    )
+    # Page 3 is admin-only: everyone can see it, non-admins get a warning
+    if admin_note:
+        embed.description += " — You cannot use these commands"
+    for name, value, inline in page["fields"]:
+        embed.add_field(name=name, value=value, inline=inline)
+
+    footer_text = f"Page {number}/{len(HELP_PAGES)} • Use ◀️ ▶️ to navigate"
+    if number == 1:  # Only add credit on first page
+        footer_text += " • ​🇵​​🇷​​🇴​​🇹​​🇪​​🇨​​🇹​​🇪​​🇩​ ​🇧​​🇾​ ​🇽​​🇪​​🇷​​🇴​"
+    embed.set_footer(text=footer_text)
+    return embed
+
+
+ADMIN_PAGE = 3
+PAGE_EMBEDS = [_build_page(i, page) for i, page in enumerate(HELP_PAGES, start=1)]
+ADMIN_PAGE_LOCKED = _build_page(ADMIN_PAGE, HELP_PAGES[ADMIN_PAGE - 1], admin_note=True)
+
+
+def page_embed(number, guild=None, is_admin=True):
+    """Cached embed for a help page, with the guild icon on page 1"""
+    if number == ADMIN_PAGE and not is_admin:
+        return ADMIN_PAGE_LOCKED
+    embed = PAGE_EMBEDS[number - 1]
+    if number == 1 and guild is not None and guild.icon:
+        embed = embed.copy()
+        embed.set_thumbnail(url=guild.icon.url)
+    return embed
+
+
+def _build_guide():
+    embed = discord.Embed(
+        title="🛡️ 𝘟 𝘎𝘶𝘢𝘳𝘥 - System Help Guide",
+        description="Learn how the bot's systems work and how to use them effectively",
+        color=discord.Color.blue()
+    )
+    
+    # Reputation System Section
+    embed.add_field(
+        name="📊 **Reputation System**",
+        value=(
+            "**How it works:**\n"
+            "• Gain **1+ reputation points** for each message you send\n"
+            "• **Longer messages** give more points (1 point per 10 characters)\n"
+            "• **Inactive users** lose 5 points every 30 minutes\n"
+            "• **Minimum reputation** is 100 points\n"
+            "• Each server keeps its own scores; admins can change these rules with `$repconfig`\n"
+            "• Check your reputation with `$rep`\n"
+            "• See the leaderboard with `$top`\n"
+            "• **Your reputation represents your activity level** in the server"
+        ),
+        inline=False
+    )
+    
+    # Moderation Section
+    embed.add_field(
+        name="⚖️ **𝘟 𝘎𝘶𝘢𝘳𝘥 Auto Moderation (Built-In)**",
+        value=(
+            "• Anti-Nuke Protection\n"
+            "• Raid detection system\n"
+            "• Suspicious account monitoring"
+            "• & more\n"
+        ),
+        inline=False
+    )
+    
+    # Utility Section
+    embed.add_field(
+        name="🔧 **Utility Commands**",
+        value=(
+            "• `$user [@user]` - View user information\n"
+            "• `$status` - Server health dashboard\n"
+            "• `$ping` - Check bot responsiveness\n"
+            "• `$x` - DDoS protection status\n"
+            "• `$save` - Manual data backup (Admin only)"
+        ),
+        inline=False
+    )
+    
+    # Entertainment Section
+    embed.add_field(
+        name="🎮 **Entertainment**",
+        value=(
+            "• `$joke` - Get a random joke\n"
+            "• `$coinflip` - Flip a coin\n"
+            "• `$dice [sides]` - Roll dice\n"
+            "• `$meme` - Random meme\n"
+        ),
+        inline=False
+    )
+    
+    # Bot Status Section
+    embed.add_field(
+        name="🤖 **Status**",
+        value=(
+            "• **24/7 operation** with auto-recovery\n"
+            "• **Data automatically saved** multiple times\n"
+            "• **Periodic maintenance** every 30 minutes\n"
+            "• **Uptime monitoring** with health checks"
+        ),
+        inline=False
+    )
+    
+    embed.set_footer(text="Use $cmds for a quick command list • 𝘮𝘢𝘥𝘦 𝘣𝘺 𝘹𝘦𝘳𝘰")
+    return embed
+
+
+GUIDE_EMBED = _build_guide()
+
+
+# === Help Navigation ===
+class HelpView(discord.ui.View):
+    """Prev/next buttons that edit the help message in place"""
+
+    def __init__(self, author, guild, page=1, timeout=20.0):
+        super().__init__(timeout=timeout)
+        self.author = author
+        self.guild = guild
+        self.is_admin = author.guild_permissions.administrator if guild else True
+        self.page = page
+        self.message = None
+        self._sync_buttons()
+
+    def current_embed(self):
+        return page_embed(self.page, self.guild, self.is_admin)
+
+    def _sync_buttons(self):
+        self.previous.disabled = self.page <= 1
+        self.next.disabled = self.page >= len(HELP_PAGES)
+
+    async def interaction_check(self, interaction):
+        # Only the person who asked for the help can flip it
+        return interaction.user.id == self.author.id
+
+    async def _flip(self, interaction, step):
+        self.page = min(max(self.page + step, 1), len(HELP_PAGES))
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.current_embed(), view=self)
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction, button):
+        await self._flip(interaction, -1)
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction, button):
+        await self._flip(interaction, 1)
+
+    async def on_timeout(self):
+        if self.message is not None:
+            try:
+                await self.message.delete()
+            except discord.HTTPException:
+                pass
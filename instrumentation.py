@@ -0,0 +1,192 @@
+import asyncio
+import bisect
+import contextvars
+import sys
+import threading
+import time
+import traceback
+
+from logs import get_logger
+
+log = get_logger("instrumentation")
+
+
+# === Latency Histograms ===
+# Bucket upper bounds in seconds (Prometheus-style, cumulative on export)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)   # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def prometheus(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+# === Metrics Registry ===
+# Command being run in the current task; REST calls made while it is set
+# are charged to it (child tasks inherit the value)
+current_command = contextvars.ContextVar("current_command", default=None)
+
+
+class Metrics:
+    def __init__(self):
+        self.commands = {}      # name -> Histogram
+        self.command_errors = {}
+        self.events = {}        # event name -> Histogram
+        self.event_errors = {}
+        self.rest_calls = {}    # command name (or "-") -> count
+        self.slow_callbacks = 0
+
+    def observe_command(self, name, seconds):
+        hist = self.commands.get(name)
+        if hist is None:
+            hist = self.commands[name] = Histogram()
+        hist.observe(seconds)
+
+    def observe_event(self, name, seconds):
+        hist = self.events.get(name)
+        if hist is None:
+            hist = self.events[name] = Histogram()
+        hist.observe(seconds)
+
+    def command_error(self, name):
+        self.command_errors[name] = self.command_errors.get(name, 0) + 1
+
+    def event_error(self, name):
+        self.event_errors[name] = self.event_errors.get(name, 0) + 1
+
+    def rest_call(self):
+        name = current_command.get() or "-"
+        self.rest_calls[name] = self.rest_calls.get(name, 0) + 1
+
+    def prometheus(self):
+        lines = ["# TYPE xguard_command_seconds histogram"]
+        for name, hist in sorted(self.commands.items()):
+            lines.extend(hist.prometheus("xguard_command_seconds", f'command="{name}"'))
+        lines.append("# TYPE xguard_command_errors_total counter")
+        for name, n in sorted(self.command_errors.items()):
+            lines.append(f'xguard_command_errors_total{{command="{name}"}} {n}')
+        lines.append("# TYPE xguard_event_seconds histogram")
+        for name, hist in sorted(self.events.items()):
+            lines.extend(hist.prometheus("xguard_event_seconds", f'event="{name}"'))
+        lines.append("# TYPE xguard_event_errors_total counter")
+        for name, n in sorted(self.event_errors.items()):
+            lines.append(f'xguard_event_errors_total{{event="{name}"}} {n}')
+        lines.append("# TYPE xguard_rest_calls_total counter")
+        for name, n in sorted(self.rest_calls.items()):
+            lines.append(f'xguard_rest_calls_total{{command="{name}"}} {n}')
+        lines.append("# TYPE xguard_slow_callbacks_total counter")
+        lines.append(f"xguard_slow_callbacks_total {self.slow_callbacks}")
+        return lines
+
+
+def instrument_http(http, metrics):
+    """Count every REST request, charged to the command that made it"""
+    original = http.request
+
+    async def request(route, **kwargs):
+        metrics.rest_call()
+        return await original(route, **kwargs)
+
+    http.request = request
+
+
+# === Event Loop Monitor ===
+class LoopMonitor:
+    """Event-loop lag sampler plus a slow-callback watchdog.
+
+    A task on the loop ticks every ``interval``; the lag is how late each
+    tick wakes up. A watchdog thread checks the last tick and, if the loop
+    has been stuck longer than ``slow_threshold``, logs the loop thread's
+    current stack once per stall, pointing at the code that is blocking.
+    """
+
+    def __init__(self, metrics=None, interval=0.25, slow_threshold=0.5):
+        self.metrics = metrics
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._last_tick = time.monotonic()
+        self._loop_thread = None
+        self._task = None
+        self._stopped = threading.Event()
+
+    async def _tick(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_tick = now
+            self.lag = max(0.0, now - started - self.interval)
+            if self.lag > self.max_lag:
+                self.max_lag = self.lag
+
+    def _watch(self):
+        reported = None
+        while not self._stopped.wait(self.slow_threshold / 2):
+            stalled = time.monotonic() - self._last_tick - self.interval
+            if stalled < self.slow_threshold:
+                reported = None
+                continue
+            if reported == self._last_tick:
+                continue  # already reported this stall
+            reported = self._last_tick
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame else "(no frame)"
+            if self.metrics:
+                self.metrics.slow_callbacks += 1
+            log.warning(f"🐢 Event loop blocked for {stalled:.2f}s+ at:\n{stack}", stalled=round(stalled, 3))
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._tick())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,366 @@
+import asyncio
+import collections
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import discord
+from discord.ext import commands
+
+from logs import get_logger
+
+log = get_logger("music")
+
+# Reconnect flags keep a dropped CDN connection from ending the track early
+FFMPEG_BEFORE = "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -nostdin"
+YTDL_OPTIONS = {
+    # Opus audio can be passed straight through to Discord without re-encoding
+    "format": "bestaudio[acodec=opus]/bestaudio/best",
+    "noplaylist": True,
+    "quiet": True,
+    "no_warnings": True,
+    "default_search": "ytsearch1",
+    "skip_download": True,
+    "extract_flat": False,
+}
+
+
+def ffmpeg_executable():
+    """System ffmpeg if installed, else the binary bundled with imageio-ffmpeg"""
+    path = shutil.which("ffmpeg")
+    if path:
+        return path
+    import imageio_ffmpeg
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+# === Stream Extraction ===
+class Extractor:
+    """Resolves queries to stream URLs with yt-dlp on a bounded thread pool.
+
+    yt-dlp is slow and fully blocking, so it never runs on the event loop.
+    At most ``workers`` extractions run at once across every guild; the
+    rest wait their turn in the pool. Identical queries in flight share
+    one extraction, and results are reused for ``ttl`` seconds (stream
+    URLs expire after a few hours).
+    """
+
+    def __init__(self, workers=4, ttl=1800, cache_size=512):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ytdl")
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()    # query -> (resolved_at, info)
+        self._inflight = {}                         # query -> Future
+        self._local = threading.local()             # one YoutubeDL per worker thread
+
+    def _extract_sync(self, query):
+        import yt_dlp
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            ydl = self._local.ydl = yt_dlp.YoutubeDL(YTDL_OPTIONS)
+        info = ydl.extract_info(query, download=False)
+        if info and "entries" in info:
+            entries = [entry for entry in info["entries"] if entry]
+            if not entries:
+                raise LookupError(f"No results for {query}")
+            info = entries[0]
+        return {
+            "title": info.get("title") or query,
+            "url": info["url"],
+            "webpage_url": info.get("webpage_url") or query,
+            "duration": info.get("duration"),
+            "acodec": info.get("acodec"),
+            "abr": info.get("abr"),
+            "headers": info.get("http_headers") or {},
+        }
+
+    async def extract(self, query):
+        cached = self._cache.get(query)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            self._cache.move_to_end(query)
+            return cached[1]
+        future = self._inflight.get(query)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._inflight[query] = loop.run_in_executor(self.pool, self._extract_sync, query)
+            future.add_done_callback(lambda f: self._finished(query, f))
+        return await asyncio.shield(future)
+
+    def _finished(self, query, future):
+        self._inflight.pop(query, None)
+        if not future.cancelled() and future.exception() is None:
+            self._cache[query] = (time.monotonic(), future.result())
+            self._cache.move_to_end(query)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+# === Per-Guild Player ===
+class Track:
+    __slots__ = ("query", "requester", "info", "resolved_at", "_task")
+
+    def __init__(self, query, requester):
+        self.query = query
+        self.requester = requester
+        self.info = None
+        self.resolved_at = 0.0
+        self._task = None
+
+    @property
+    def title(self):
+        return self.info["title"] if self.info else self.query
+
+    def prefetch(self, extractor):
+        """Start resolving the stream URL in the background (idempotent)"""
+        if self._task is None or (self._task.done() and self.stale(extractor.ttl)):
+            self._task = asyncio.ensure_future(extractor.extract(self.query))
+        return self._task
+
+    def stale(self, ttl):
+        return self.info is not None and time.monotonic() - self.resolved_at >= ttl
+
+    async def resolve(self, extractor):
+        self.info = await self.prefetch(extractor)
+        self.resolved_at = time.monotonic()
+        return self.info
+
+
+class GuildPlayer:
+    """Queue and playback loop for one guild's voice session.
+
+    While a track plays, the next ``prefetch`` queued tracks are already
+    being resolved, so the following track starts as soon as the current
+    one ends. Audio is handed to ffmpeg as Opus: passed through untouched
+    when the source already is Opus, otherwise encoded by ffmpeg rather
+    than by the bot process.
+    """
+
+    def __init__(self, manager, guild):
+        self.manager = manager
+        self.guild = guild
+        self.queue = collections.deque()
+        self.current = None
+        self.voice = None
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def enqueue(self, track):
+        if len(self.queue) >= self.manager.queue_limit:
+            raise OverflowError(f"The queue is full ({self.manager.queue_limit} tracks)")
+        self.queue.append(track)
+        self._prefetch()
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def _prefetch(self):
+        for track in list(self.queue)[:self.manager.prefetch]:
+            track.prefetch(self.manager.extractor)
+
+    def _source(self, info):
+        options = {"before_options": FFMPEG_BEFORE, "options": "-vn",
+                   "executable": self.manager.ffmpeg}
+        if info["headers"]:
+            headers = "".join(f"{k}: {v}\r\n" for k, v in info["headers"].items())
+            options["before_options"] += f' -headers "{headers}"'
+        if info["acodec"] == "opus":
+            return discord.FFmpegOpusAudio(info["url"], codec="copy", **options)
+        return discord.FFmpegOpusAudio(info["url"], bitrate=self.manager.bitrate, **options)
+
+    async def _next(self):
+        while not self.queue:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.manager.idle_timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.queue.popleft()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                track = await self._next()
+                if track is None or self.voice is None or not self.voice.is_connected():
+                    return
+                self.current = track
+                finished = asyncio.Event()
+                try:
+                    info = await track.resolve(self.manager.extractor)
+                    self.voice.play(self._source(info),
+                                    after=lambda error, done=finished: loop.call_soon_threadsafe(done.set))
+                except Exception as e:
+                    log.warning("⚠️ Could not play track", guild=self.guild.id, query=track.query, error=e)
+                    self.current = None
+                    continue
+                self._prefetch()
+                await finished.wait()
+                self.current = None
+        finally:
+            self.current = None
+            await self.manager.release(self)
+
+    def skip(self):
+        if self.voice is not None and (self.voice.is_playing() or self.voice.is_paused()):
+            self.voice.stop()   # the after-callback moves on to the next track
+
+    async def stop(self):
+        self.queue.clear()
+        self._wakeup.set()
+        if self._task is not None:
+            self._task.cancel()
+        if self.voice is not None:
+            voice, self.voice = self.voice, None
+            if voice.is_playing():
+                voice.stop()
+            await voice.disconnect(force=True)
+
+
+class MusicManager:
+    """Every guild's player plus the shared extraction pool"""
+
+    def __init__(self, extractor, max_sessions=0, queue_limit=100, prefetch=1,
+                 idle_timeout=300, bitrate=128):
+        self.extractor = extractor
+        self.max_sessions = max_sessions    # concurrent voice connections (0 = no cap)
+        self.queue_limit = queue_limit
+        self.prefetch = prefetch
+        self.idle_timeout = idle_timeout
+        self.bitrate = bitrate
+        self.ffmpeg = ffmpeg_executable()
+        self.players = {}   # guild_id -> GuildPlayer
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ.get
+        return cls(
+            Extractor(workers=int(env("MUSIC_EXTRACT_WORKERS", 4))),
+            max_sessions=int(env("MUSIC_MAX_SESSIONS", 0)),
+            queue_limit=int(env("MUSIC_QUEUE_LIMIT", 100)),
+            prefetch=int(env("MUSIC_PREFETCH", 1)),
+            idle_timeout=float(env("MUSIC_IDLE_TIMEOUT", 300)),
+            bitrate=int(env("MUSIC_BITRATE", 128)),
+        )
+
+    async def connect(self, guild, channel):
+        """Player for a guild, joined to (or moved into) a voice channel"""
+        player = self.players.get(guild.id)
+        if player is None:
+            if self.max_sessions and len(self.players) >= self.max_sessions:
+                raise OverflowError("Too many servers are playing music right now, try again later")
+            player = self.players[guild.id] = GuildPlayer(self, guild)
+        if player.voice is None or not player.voice.is_connected():
+            player.voice = await channel.connect(self_deaf=True)
+        elif player.voice.channel != channel:
+            await player.voice.move_to(channel)
+        return player
+
+    async def release(self, player):
+        """Forget a player whose queue ran dry and leave its voice channel"""
+        if self.players.get(player.guild.id) is player:
+            del self.players[player.guild.id]
+        if player.voice is not None:
+            voice, player.voice = player.voice, None
+            await voice.disconnect(force=True)
+
+    async def close(self):
+        for player in list(self.players.values()):
+            await player.stop()
+        self.players.clear()
+        self.extractor.close()
+
+
+# === Commands ===
+class Music(commands.Cog):
+    """$play, $skip, $queue and $stop (loaded when ENABLE_MUSIC=1)"""
+
+    def __init__(self, bot, manager):
+        self.bot = bot
+        self.manager = manager
+
+    async def cog_unload(self):
+        await self.manager.close()
+
+    async def cog_check(self, ctx):
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage()
+        return True
+
+    @commands.command()
+    async def play(self, ctx, *, query: str):
+        """Queue a song (search terms or URL) in your voice channel"""
+        ctx.discard()
+        if ctx.author.voice is None or ctx.author.voice.channel is None:
+            await ctx.send("❌ Join a voice channel first.", delete_after=5)
+            return
+        try:
+            player = await self.manager.connect(ctx.guild, ctx.author.voice.channel)
+            track = Track(query, ctx.author.id)
+            player.enqueue(track)
+        except (OverflowError, discord.ClientException, asyncio.TimeoutError) as e:
+            await ctx.send(f"❌ {e}", delete_after=7)
+            return
+        try:
+            await track.resolve(self.manager.extractor)
+        except Exception:
+            if track in player.queue:
+                player.queue.remove(track)
+            await ctx.send(f"❌ Couldn't find anything for **{query}**.", delete_after=7)
+            return
+        if player.current is track:
+            await ctx.send(f"🎵 Now playing **{track.title}**", delete_after=15)
+        else:
+            await ctx.send(f"🎵 Queued **{track.title}** (#{len(player.queue)})", delete_after=10)
+
+    @commands.command()
+    async def skip(self, ctx):
+        """Skip the current song"""
+        ctx.discard()
+        player = self.manager.players.get(ctx.guild.id)
+        if player is None or player.current is None:
+            await ctx.send("❌ Nothing is playing.", delete_after=5)
+            return
+        player.skip()
+        await ctx.send(f"⏭️ Skipped **{player.current.title}**", delete_after=5)
+
+    @commands.command(name="queue")
+    async def show_queue(self, ctx):
+        """Show the song queue"""
+        ctx.discard()
+        player = self.manager.players.get(ctx.guild.id)
+        if player is None or (player.current is None and not player.queue):
+            await ctx.send("📭 The queue is empty.", delete_after=5)
+            return
+        lines = []
+        if player.current is not None:
+            lines.append(f"▶️ **{player.current.title}**")
+        lines += [f"**{i}.** {track.title}" for i, track in enumerate(list(player.queue)[:10], start=1)]
+        if len(player.queue) > 10:
+            lines.append(f"…and {len(player.queue) - 10} more")
+        embed = discord.Embed(title="🎶 Queue", description="\n".join(lines), color=discord.Color.blurple())
+        await ctx.send(embed=embed, delete_after=30)
+
+    @commands.command()
+    async def stop(self, ctx):
+        """Stop playback, clear the queue and leave the voice channel"""
+        ctx.discard()
+        player = self.manager.players.pop(ctx.guild.id, None)
+        if player is None:
+            await ctx.send("❌ Nothing is playing.", delete_after=5)
+            return
+        await player.stop()
+        await ctx.send("⏹️ Stopped and cleared the queue.", delete_after=5)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        # Kicked or disconnected from voice: drop the guild's player
+        if member.id == self.bot.user.id and before.channel is not None and after.channel is None:
+            player = self.manager.players.pop(member.guild.id, None)
+            if player is not None:
+                player.voice = None
+                await player.stop()
@@ -0,0 +1,152 @@
+import asyncio
+import datetime
+import re
+import time
+
+import discord
+from discord.ext import commands
+
+
+# === Purge Engine ===
+# Discord only bulk-deletes messages younger than 14 days; keep a safety
+# margin so a batch doesn't fail because a message aged out while queued
+BULK_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=5)
+BULK_BATCH = 100
+LINK_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+
+
+class PurgeFlags(commands.FlagConverter, delimiter=":", case_insensitive=True):
+    """Filters for $purge, e.g. ``$purge 500 user: @spammer links: yes``"""
+    user: discord.User = None
+    regex: str = None
+    attachments: bool = False
+    links: bool = False
+    bots: bool = False
+    before: int = None      # message ID
+    after: int = None       # message ID
+    scan: int = None        # max messages to look at (defaults to 10x amount when filtering)
+
+
+def build_check(flags):
+    """Compile the flags into one predicate over a message"""
+    tests = []
+    if flags.user:
+        user_id = flags.user.id
+        tests.append(lambda m: m.author.id == user_id)
+    if flags.regex:
+        pattern = re.compile(flags.regex, re.IGNORECASE)
+        tests.append(lambda m: pattern.search(m.content) is not None)
+    if flags.attachments:
+        tests.append(lambda m: bool(m.attachments))
+    if flags.links:
+        tests.append(lambda m: LINK_RE.search(m.content) is not None)
+    if flags.bots:
+        tests.append(lambda m: m.author.bot)
+    if not tests:
+        return None
+    return lambda m: all(test(m) for test in tests)
+
+
+class PurgeStats:
+    def __init__(self):
+        self.scanned = 0
+        self.bulk_deleted = 0
+        self.single_deleted = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+
+    @property
+    def deleted(self):
+        return self.bulk_deleted + self.single_deleted
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        rate = self.deleted / self.elapsed if self.elapsed else 0.0
+        return (
+            f"{self.deleted} deleted ({self.bulk_deleted} bulk, {self.single_deleted} single), "
+            f"{self.scanned} scanned, {rate:.0f} msg/s"
+        )
+
+
+async def purge_channel(channel, amount, check=None, before=None, after=None,
+                        scan_limit=None, progress=None, progress_interval=2.0):
+    """Delete up to ``amount`` matching messages from ``channel``.
+
+    History is streamed page by page (newest first). Messages under 14
+    days old are collected into 100-message bulk deletes; older ones go to
+    a single-delete worker. Both run alongside the history scan, so the
+    scan never waits on deletes and vice versa.
+    """
+    stats = PurgeStats()
+    bulk_queue = asyncio.Queue(maxsize=4)
+    single_queue = asyncio.Queue(maxsize=500)
+    if scan_limit is None:
+        scan_limit = amount if check is None else amount * 10
+
+    async def bulk_worker():
+        while (batch := await bulk_queue.get()) is not None:
+            try:
+                if len(batch) == 1:
+                    await batch[0].delete()
+                else:
+                    await channel.delete_messages(batch)
+                stats.bulk_deleted += len(batch)
+            except discord.NotFound:
+                stats.bulk_deleted += len(batch)  # already gone
+            except discord.HTTPException:
+                # Fall back to deleting this batch one by one
+                for message in batch:
+                    await single_queue.put(message)
+
+    async def single_worker():
+        while (message := await single_queue.get()) is not None:
+            for attempt in range(3):
+                try:
+                    await message.delete()
+                    stats.single_deleted += 1
+                    break
+                except discord.NotFound:
+                    break
+                except discord.Forbidden:
+                    stats.failed += 1
+                    break
+                except discord.HTTPException:
+                    await asyncio.sleep(2 ** attempt)
+            else:
+                stats.failed += 1
+
+    bulk_task = asyncio.create_task(bulk_worker())
+    single_task = asyncio.create_task(single_worker())
+    last_report = time.perf_counter()
+    try:
+        cutoff = discord.utils.utcnow() - BULK_MAX_AGE
+        batch = []
+        matched = 0
+        async for message in channel.history(limit=scan_limit, before=before, after=after, oldest_first=False):
+            stats.scanned += 1
+            if progress and time.perf_counter() - last_report >= progress_interval:
+                last_report = time.perf_counter()
+                await progress(stats)
+            if check is not None and not check(message):
+                continue
+            matched += 1
+            if message.created_at > cutoff:
+                batch.append(message)
+                if len(batch) == BULK_BATCH:
+                    await bulk_queue.put(batch)
+                    batch = []
+            else:
+                await single_queue.put(message)
+            if matched >= amount:
+                break
+        if batch:
+            await bulk_queue.put(batch)
+    finally:
+        await bulk_queue.put(None)
+        await bulk_task
+        await single_queue.put(None)
+        await single_task
+    return stats
@@ -0,0 +1,297 @@
+import bisect
+import itertools
+import math
+
+
+# === Order-Statistics Index ===
+class Fenwick:
+    """Binary indexed tree of counts with k-th element search"""
+
+    __slots__ = ("size", "tree", "top_bit")
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.top_bit = 1 << (size.bit_length() - 1) if size else 0
+
+    def add(self, index, delta):
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, index):
+        """Sum of counts at positions 0..index"""
+        total = 0
+        i = index + 1
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, k):
+        """Smallest position whose prefix sum reaches k (k >= 1)"""
+        pos = 0
+        step = self.top_bit
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+
+class RankIndex:
+    """Reputation ranking kept up to date incrementally.
+
+    Scores are bounded (low..high), so Fenwick trees over values give "how
+    many users are above this score" and "which score holds the n-th
+    place" without ever sorting users.
+
+    Decay never moves anyone in the index. A user with stored score ``s``
+    last active at ``t`` has lost ``floor((now - t) / period)`` steps, which
+    is ``A - B`` steps, less one while their phase in the period ``t % period``
+    is still ahead of ``now % period``. ``A`` and ``B`` are the period
+    numbers of ``now`` and ``t``. So ``key = s + points * B`` never changes
+    for a user. Their current score is ``key - points * A``, plus
+    ``points`` while their phase is ahead. Decaying users sit in a ring of
+    key buckets (each sorted by phase), and a period going by only shifts
+    the window over the ring. Keys falling off its bottom are users already
+    at the floor, retired a whole bucket at a time. Users that don't decay
+    (no activity time, at or below the floor, or no decay configured) are
+    counted by score instead.
+
+    Scores above ``cap`` (e.g. after max_rep was lowered) rank above it but
+    report ``cap``. The index keeps its own clock, which never runs
+    backwards.
+    """
+
+    def __init__(self, low, cap, points, period, high=None):
+        self.low = low
+        self.cap = cap
+        self.high = max(cap, high or cap)   # highest score any user can hold
+        self.points = points
+        self.period = period
+        self.counts = Fenwick(self.high - low + 1)  # non-decaying users by score (and retired ones at low)
+        self.still = {}         # score -> {user_id: None} (ordered set)
+        self.retired = {}       # key -> [(phase, user_id)] for users decayed to the floor, sorted
+        self.static = 0         # users counted in ``counts``
+        width = self.high - low + points + 1
+        self.ring_size = 1 << max(width - 1, 1).bit_length()
+        self.ring = Fenwick(self.ring_size)  # decaying users by key % ring_size
+        self.keys = {}          # key -> [(phase, user_id)] sorted by phase
+        self.scores = {}        # user_id -> (score, None) or (key, phase)
+        self.now = None
+        self.epoch = None       # period number of ``now``
+        self.phase = 0.0        # ``now % period``
+        self.retire_below = None  # keys at or below this are at the floor for good
+
+    @classmethod
+    def from_rows(cls, low, cap, points, period, rows, now):
+        """Index every ``(user_id, (score, last_active))`` in ``rows`` as of ``now``"""
+        rows = list(rows)
+        ranking = cls(low, cap, points, period, max((score for _, (score, _) in rows), default=cap))
+        ranking.advance(now)
+        for user_id, (score, last_active) in rows:
+            ranking._add(user_id, score, last_active, sort=False)
+        for buckets in (ranking.keys, ranking.retired):
+            for bucket in buckets.values():
+                bucket.sort()
+        return ranking
+
+    def __len__(self):
+        return len(self.scores)
+
+    # --- clock ---
+    def advance(self, now):
+        """Move the clock forward; retires keys that can only be at the floor now"""
+        if self.now is not None and now <= self.now:
+            return
+        self.now = now
+        epoch, self.phase = divmod(now, self.period)
+        epoch = int(epoch)
+        if self.epoch is not None and epoch == self.epoch:
+            return
+        # A key at or below low + points * (epoch - 1) is at the floor even
+        # with its phase ahead. Only keys still in the window are visited,
+        # however long the index sat idle.
+        floor_key = self.low + self.points * (epoch - 1)
+        if self.retire_below is not None:
+            for key in range(self.retire_below + 1, min(floor_key, self._top_key()) + 1):
+                bucket = self.keys.pop(key, None)
+                if bucket:
+                    self.ring.add(key % self.ring_size, -len(bucket))
+                    self.retired[key] = bucket
+                    self.counts.add(0, len(bucket))
+                    self.static += len(bucket)
+        self.epoch = epoch
+        self.retire_below = floor_key
+
+    def _top_key(self):
+        return self.high + self.points * self.epoch
+
+    # --- membership ---
+    def _add(self, user_id, score, last_active, sort=True):
+        score = min(score, self.high)
+        if last_active is None or score <= self.low or not self.points:
+            score = max(score, self.low)
+            self.still.setdefault(score, {})[user_id] = None
+            self.counts.add(score - self.low, 1)
+            self.static += 1
+            self.scores[user_id] = (score, None)
+            return
+        epoch, phase = divmod(last_active, self.period)
+        key = score + self.points * int(epoch)
+        entry = (phase, user_id)
+        retired = key <= self.retire_below   # already decayed to the floor
+        bucket = (self.retired if retired else self.keys).setdefault(key, [])
+        if sort:
+            bisect.insort(bucket, entry)
+        else:
+            bucket.append(entry)
+        if retired:
+            self.counts.add(0, 1)
+            self.static += 1
+        else:
+            self.ring.add(key % self.ring_size, 1)
+        self.scores[user_id] = (key, phase)
+
+    def _remove(self, user_id):
+        key, phase = self.scores.pop(user_id)
+        if phase is None:
+            bucket = self.still[key]
+            del bucket[user_id]
+            if not bucket:
+                del self.still[key]
+            self.counts.add(key - self.low, -1)
+            self.static -= 1
+            return
+        entry = (phase, user_id)
+        retired = key <= self.retire_below
+        buckets = self.retired if retired else self.keys
+        bucket = buckets[key]
+        del bucket[bisect.bisect_left(bucket, entry)]
+        if retired:
+            self.counts.add(0, -1)
+            self.static -= 1
+        else:
+            self.ring.add(key % self.ring_size, -1)
+        if not bucket:
+            del buckets[key]
+
+    def update(self, user_id, score, last_active, now):
+        """Record a user's stored score as of ``last_active``"""
+        self.advance(now if last_active is None else max(now, last_active))
+        if user_id in self.scores:
+            self._remove(user_id)
+        self._add(user_id, score, last_active)
+
+    # --- queries ---
+    def current(self, user_id):
+        """A user's score as of the index's clock, or None if untracked"""
+        entry = self.scores.get(user_id)
+        if entry is None:
+            return None
+        key, phase = entry
+        if phase is None:
+            score = key
+        elif key <= self.retire_below:
+            score = self.low
+        else:
+            score = key - self.points * self.epoch + (self.points if phase > self.phase else 0)
+        return min(max(score, self.low), self.cap)
+
+    def _ring_count(self, after, upto):
+        """Decaying users with ``after < key <= upto``"""
+        after = max(after, self.retire_below)
+        upto = min(upto, self._top_key())
+        if upto <= after:
+            return 0
+        first, last = (after + 1) % self.ring_size, upto % self.ring_size
+        prefix = self.ring.prefix
+        if first <= last:
+            return prefix(last) - prefix(first - 1)
+        return prefix(self.ring_size - 1) - prefix(first - 1) + prefix(last)
+
+    def _ahead(self, bucket):
+        """Index of the first entry whose phase is ahead of the clock"""
+        return bisect.bisect_right(bucket, (self.phase, math.inf))
+
+    def above(self, score):
+        """Users whose current score is above ``score``"""
+        if score >= self.cap:
+            return 0
+        total = self.static - self.counts.prefix(score - self.low)
+        # Keys above score + points * epoch are above it whatever their
+        # phase; the ``points`` keys just below only while phase is ahead
+        key = score + self.points * self.epoch
+        total += self._ring_count(key, self._top_key())
+        for k in range(max(key - self.points, self.retire_below) + 1, min(key, self._top_key()) + 1):
+            bucket = self.keys.get(k)
+            if bucket:
+                total += len(bucket) - self._ahead(bucket)
+        return total
+
+    def _at(self, score):
+        """Users whose current (reported) score is ``score``"""
+        if score == self.cap:
+            for exact in range(self.high, self.cap - 1, -1):
+                yield from self._exactly(exact)
+            return
+        if score > self.low:
+            yield from self._exactly(score)
+            return
+        yield from self.still.get(self.low, ())
+        for bucket in self.retired.values():
+            for _, user_id in bucket:
+                yield user_id
+        for key in range(self.retire_below + 1, self.low + self.points * self.epoch + 1):
+            bucket = self.keys.get(key)
+            if bucket:
+                for _, user_id in bucket[:self._ahead(bucket)]:
+                    yield user_id
+
+    def _exactly(self, score):
+        """Users whose uncapped current score is ``score`` (above low)"""
+        yield from self.still.get(score, ())
+        if not self.points:
+            return
+        key = score + self.points * self.epoch
+        bucket = self.keys.get(key)
+        if bucket:
+            for _, user_id in bucket[:self._ahead(bucket)]:
+                yield user_id
+        bucket = self.keys.get(key - self.points)
+        if bucket:
+            for _, user_id in bucket[self._ahead(bucket):]:
+                yield user_id
+
+    def rank(self, user_id):
+        """1-based place of a user (ties share a place), or None if untracked"""
+        score = self.current(user_id)
+        if score is None:
+            return None
+        return self.above(score) + 1
+
+    def top(self, count, offset=0):
+        """``count`` ``(user_id, score)`` pairs starting at place ``offset + 1``"""
+        if offset >= len(self.scores) or count <= 0:
+            return []
+        # Highest score with more than ``offset`` users at or above it
+        low, high = self.low, self.cap
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.above(mid - 1) > offset:
+                low = mid
+            else:
+                high = mid - 1
+        score = low
+        skip = offset - self.above(score)
+        results = []
+        while score >= self.low and len(results) < count:
+            for user_id in itertools.islice(self._at(score), skip, skip + count - len(results)):
+                results.append((user_id, score))
+            skip = 0
+            score -= 1
+        return results
@@ -0,0 +1,299 @@
+import os
+import threading
+import time
+
+from ranking import RankIndex
+
+
+# === Reputation Rules ===
+BASE_REP = 100          # Starting (and minimum) reputation
+MAX_REP = 1000          # Maximum reputation cap
+DECAY_POINTS = 5        # Points lost per idle period
+DECAY_PERIOD = 1800     # Idle period length in seconds (30 minutes)
+
+
+class GuildConfig:
+    """Reputation rules for one guild.
+
+    Points per message are ``points_base`` plus one per ``chars_per_point``
+    characters, capped at ``max_points`` (0 means no cap). Messages in
+    ``ignored_channels`` earn nothing. Instances are treated as immutable;
+    replace() returns a changed copy.
+    """
+
+    DEFAULTS = {
+        "base_rep": BASE_REP,
+        "max_rep": MAX_REP,
+        "decay_points": DECAY_POINTS,
+        "decay_period": DECAY_PERIOD,
+        "points_base": 1,
+        "chars_per_point": 10,
+        "max_points": 0,
+        "ignored_channels": frozenset(),
+    }
+    __slots__ = tuple(DEFAULTS)
+
+    def __init__(self, **values):
+        unknown = set(values) - set(self.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown reputation setting: {', '.join(sorted(unknown))}")
+        for name, default in self.DEFAULTS.items():
+            value = values.get(name, default)
+            setattr(self, name, frozenset(value) if name == "ignored_channels" else int(value))
+        if self.base_rep < 0 or self.max_rep <= self.base_rep:
+            raise ValueError("max_rep must be above base_rep (and base_rep at least 0)")
+        if self.decay_period <= 0 or self.chars_per_point <= 0:
+            raise ValueError("decay_period and chars_per_point must be positive")
+        if self.decay_points < 0 or self.points_base < 0 or self.max_points < 0:
+            raise ValueError("decay_points, points_base and max_points can't be negative")
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**(data or {}))
+
+    def to_dict(self):
+        """JSON-friendly form holding only the settings that differ from the defaults"""
+        data = {}
+        for name, default in self.DEFAULTS.items():
+            value = getattr(self, name)
+            if value != default:
+                data[name] = sorted(value) if name == "ignored_channels" else value
+        return data
+
+    def replace(self, **changes):
+        values = {name: getattr(self, name) for name in self.DEFAULTS}
+        values.update(changes)
+        return GuildConfig(**values)
+
+    def __eq__(self, other):
+        return isinstance(other, GuildConfig) and all(
+            getattr(self, name) == getattr(other, name) for name in self.DEFAULTS
+        )
+
+    def message_points(self, content):
+        """Base points + extra for message length (1 point per 10 chars by default)"""
+        points = self.points_base + len(content) // self.chars_per_point
+        return min(points, self.max_points) if self.max_points else points
+
+    def decayed(self, score, last_active, now):
+        """Apply inactivity decay to a score saved at ``last_active``.
+
+        Same result as taking decay_points off every decay_period idle
+        seconds, but worked out in one step when the score is read instead
+        of by a periodic sweep.
+        """
+        if last_active is None or score <= self.base_rep:
+            return score
+        periods = int((now - last_active) // self.decay_period)
+        if periods <= 0:
+            return score
+        return max(score - periods * self.decay_points, self.base_rep)
+
+
+DEFAULT_CONFIG = GuildConfig()
+
+
+def current_score(store, guild_id, user_id, config=DEFAULT_CONFIG, now=None):
+    """Reputation for a user in a guild as of ``now`` (decay included)"""
+    now = time.time() if now is None else now
+    row = store.get(guild_id, user_id)
+    if row is None:
+        return config.base_rep
+    return min(config.decayed(row[0], row[1], now), config.max_rep)
+
+
+def add_points(store, guild_id, user_id, points, config=DEFAULT_CONFIG, now=None):
+    """Decay the stored score up to ``now``, add points and reset the idle clock"""
+    now = time.time() if now is None else now
+    score = min(current_score(store, guild_id, user_id, config, now) + points, config.max_rep)
+    store.set(guild_id, user_id, score, last_active=now)
+    return score
+
+
+class ReputationService:
+    """Reputation reads and updates against one store, namespaced by guild.
+
+    Updates are a read-modify-write, so they run under a lock; this keeps
+    them atomic with backfill batches and ranking builds running on other
+    threads. Each guild gets its own GuildConfig (cached
+    here until set_config() changes it) and its own RankIndex, built the
+    first time the guild is ranked and kept in step with every update.
+    rank() and top() may build one, so the bot calls them off the event
+    loop.
+    """
+
+    def __init__(self, store, evict_after=0):
+        self.store = store
+        self.evict_after = evict_after  # seconds idle before a guild is unloaded (0 = never)
+        self._lock = threading.Lock()
+        self.configs = {}       # guild_id -> GuildConfig
+        self.rankings = {}      # guild_id -> RankIndex
+        self._building = {}     # guild_id -> (updates made meanwhile, done Event) while its RankIndex builds
+
+    # --- configuration ---
+    def config(self, guild_id):
+        config = self.configs.get(guild_id)
+        if config is None:
+            config = GuildConfig.from_dict(self.store.load_config(guild_id))
+            self.configs[guild_id] = config
+        return config
+
+    def set_config(self, guild_id, **changes):
+        """Change (and save) a guild's settings; returns the new GuildConfig"""
+        with self._lock:
+            config = self.config(guild_id).replace(**changes)
+            self.store.save_config(guild_id, config.to_dict())
+            self.configs[guild_id] = config
+            # Caps or decay may have changed; rebuild the ranking on next use
+            self.rankings.pop(guild_id, None)
+            return config
+
+    # --- scores ---
+    def _ranking(self, guild_id, now):
+        """The guild's RankIndex, caught up to ``now``; call with the lock held.
+
+        The first call for a guild releases the lock while the index is
+        built from a copy of its rows, so updates aren't held up behind
+        it; updates made meanwhile are replayed before it is installed.
+        Other callers wait for that build instead of starting their own.
+        """
+        ranking = self.rankings.get(guild_id)
+        while ranking is None:
+            build = self._building.get(guild_id)
+            if build is not None:
+                self._lock.release()
+                try:
+                    build[1].wait()
+                finally:
+                    self._lock.acquire()
+            else:
+                config = self.config(guild_id)
+                replay, done = self._building[guild_id] = ([], threading.Event())
+                self._lock.release()
+                locked = False
+                try:
+                    built = RankIndex.from_rows(config.base_rep, config.max_rep, config.decay_points,
+                                                config.decay_period, self.store.rows(guild_id), now)
+                    self._lock.acquire()
+                    locked = True
+                    # Catch up unlocked while many updates are queued (a
+                    # few rounds at most), so updates wait on a short replay
+                    for _ in range(4):
+                        if len(replay) <= 256:
+                            break
+                        batch = replay[:]
+                        replay.clear()
+                        self._lock.release()
+                        locked = False
+                        for user_id, score, last_active in batch:
+                            built.update(user_id, score, last_active, last_active)
+                        self._lock.acquire()
+                        locked = True
+                    for user_id, score, last_active in replay:
+                        built.update(user_id, score, last_active, last_active)
+                finally:
+                    if not locked:
+                        self._lock.acquire()
+                    del self._building[guild_id]
+                    done.set()
+                # Settings changed (or the guild was evicted) meanwhile: build again
+                if self.configs.get(guild_id) is config:
+                    self.rankings[guild_id] = built
+            ranking = self.rankings.get(guild_id)
+        ranking.advance(now)
+        return ranking
+
+    def _ranked(self, guild_id, user_id, score, now):
+        """Keep the guild's ranking (or one being built) in step with an update"""
+        ranking = self.rankings.get(guild_id)
+        if ranking is not None:
+            ranking.update(user_id, score, now, now)
+        elif guild_id in self._building:
+            self._building[guild_id][0].append((user_id, score, now))
+
+    def score(self, guild_id, user_id, now=None):
+        return current_score(self.store, guild_id, user_id, self.config(guild_id), now)
+
+    def add_points(self, guild_id, user_id, points, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            score = add_points(self.store, guild_id, user_id, points, self.config(guild_id), now)
+            self._ranked(guild_id, user_id, score, now)
+            return score
+
+    def add_many(self, guild_id, points, now=None):
+        """add_points() for a whole ``{user_id: points}`` batch under one lock"""
+        now = time.time() if now is None else now
+        with self._lock:
+            config = self.config(guild_id)
+            for user_id, user_points in points.items():
+                score = add_points(self.store, guild_id, user_id, user_points, config, now)
+                self._ranked(guild_id, user_id, score, now)
+            return len(points)
+
+    def add_message(self, guild_id, channel_id, user_id, content, now=None):
+        """Award a message's points under the guild's rules; None if the channel is ignored"""
+        config = self.config(guild_id)
+        if channel_id in config.ignored_channels:
+            return None
+        return self.add_points(guild_id, user_id, config.message_points(content), now)
+
+    def rank(self, guild_id, user_id, now=None):
+        """``(place, tracked users)``; place is None for users with no score yet"""
+        with self._lock:
+            ranking = self._ranking(guild_id, time.time() if now is None else now)
+            return ranking.rank(user_id), len(ranking)
+
+    def top(self, guild_id, n, offset=0, now=None):
+        """Leaderboard page as ``(user_id, score)`` pairs, decay included"""
+        with self._lock:
+            return self._ranking(guild_id, time.time() if now is None else now).top(n, offset)
+
+    # --- guild lifecycle ---
+    def preload(self, guild_ids):
+        """Load several guilds' rows up front (blocking)"""
+        for guild_id in guild_ids:
+            self.store.load(guild_id)
+
+    def evict(self, guild_id):
+        """Save a guild and drop its rows, config and ranking from memory"""
+        # The save writes and fsyncs a file; doing it outside the lock keeps
+        # other guilds' updates from waiting on it
+        if not self.store.evict(guild_id):
+            return False
+        with self._lock:
+            self.rankings.pop(guild_id, None)
+            self.configs.pop(guild_id, None)
+        return True
+
+    def clear(self, guild_id):
+        """Delete every score in a guild (blocking); its settings stay"""
+        self.store.clear(guild_id)
+        with self._lock:
+            self.rankings.pop(guild_id, None)
+            # Also turns away an index being built from the old rows
+            self.configs.pop(guild_id, None)
+
+    def evict_idle(self):
+        if not self.evict_after:
+            return []
+        return [g for g in self.store.idle_guilds(self.evict_after) if self.evict(g)]
+
+    # --- persistence ---
+    def has_pending(self):
+        return self.store.dirty
+
+    def flush(self, force=False):
+        return self.store.flush(force)
+
+    def start(self):
+        self.store.start(housekeeping=self.evict_idle)
+
+    def close(self):
+        self.store.close()
+
+    @classmethod
+    def from_env(cls):
+        """Service over the REP_* configured store; REP_EVICT_AFTER unloads idle guilds"""
+        from storage import store_from_env
+        return cls(store_from_env(), evict_after=float(os.environ.get("REP_EVICT_AFTER", 21600)))
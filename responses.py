@@ -0,0 +1,130 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+
+import discord
+from discord.ext import commands
+
+from logs import get_logger
+
+log = get_logger("responses")
+
+
+# === Message Cleanup ===
+class Cleanup:
+    """Deletes messages when their time is up, batched per channel.
+
+    Replaces ``delete_after`` (one sleeping task per message) and awaited
+    ``ctx.message.delete()`` calls with one background task and a heap of
+    due times. Everything due within ``batch_window`` seconds of the
+    earliest entry goes out together: one bulk delete per channel where
+    the bot can manage messages, concurrent single deletes otherwise.
+    Messages that are already gone are skipped silently.
+    """
+
+    def __init__(self, batch_window=1.0):
+        self.batch_window = batch_window
+        self.deleted = 0
+        self.requests = 0       # REST calls made
+        self._heap = []         # (due, seq, message)
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._task = None
+
+    def schedule(self, message, delay=0.0):
+        """Delete ``message`` after ``delay`` seconds (without waiting for it)"""
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), message))
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            # Fresh context: started from a command, the task would inherit
+            # its current_command and bill every later delete to it
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+        elif self._heap[0][2] is message:
+            self._wakeup.set()  # new earliest entry
+
+    def prometheus(self):
+        return [
+            "# TYPE xguard_cleanup_deleted_total counter",
+            f"xguard_cleanup_deleted_total {self.deleted}",
+            "# TYPE xguard_cleanup_requests_total counter",
+            f"xguard_cleanup_requests_total {self.requests}",
+            "# TYPE xguard_cleanup_pending gauge",
+            f"xguard_cleanup_pending {len(self._heap)}",
+        ]
+
+    async def _run(self):
+        while self._heap:
+            wait = self._heap[0][0] - time.monotonic()
+            if wait > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            cutoff = time.monotonic() + self.batch_window
+            by_channel = {}
+            while self._heap and self._heap[0][0] <= cutoff:
+                message = heapq.heappop(self._heap)[2]
+                by_channel.setdefault(message.channel.id, []).append(message)
+            await asyncio.gather(*(self._delete(messages) for messages in by_channel.values()))
+
+    def _can_bulk(self, channel):
+        guild = getattr(channel, "guild", None)
+        return guild is not None and channel.permissions_for(guild.me).manage_messages
+
+    async def _delete(self, messages):
+        # Bulk deletes take at most 100 messages
+        for start in range(0, len(messages), 100):
+            batch = messages[start:start + 100]
+            if len(batch) > 1 and self._can_bulk(batch[0].channel):
+                self.requests += 1
+                try:
+                    await batch[0].channel.delete_messages(batch)
+                    self.deleted += len(batch)
+                    continue
+                except discord.HTTPException:
+                    pass  # e.g. one of them is already gone; fall back to one by one
+            await asyncio.gather(*(self._delete_one(message) for message in batch))
+
+    async def _delete_one(self, message):
+        self.requests += 1
+        try:
+            await message.delete()
+            self.deleted += 1
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            log.debug("Cleanup delete failed", channel=message.channel.id, message=message.id, error=e)
+
+    async def flush(self):
+        """Delete everything still scheduled right away (on shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        messages, self._heap = [m for _, _, m in self._heap], []
+        by_channel = {}
+        for message in messages:
+            by_channel.setdefault(message.channel.id, []).append(message)
+        await asyncio.gather(*(self._delete(batch) for batch in by_channel.values()))
+
+
+# === Command Context ===
+class ResponseContext(commands.Context):
+    """Context whose cleanup never sits in front of the reply.
+
+    ``ctx.discard()`` hands the invoking message to the bot's Cleanup
+    instead of waiting on the delete, so the reply goes out at the same
+    time, and ``delete_after`` on ``ctx.send`` is scheduled there too.
+    """
+
+    def discard(self):
+        self.bot.cleanup.schedule(self.message)
+
+    async def send(self, content=None, *, delete_after=None, **kwargs):
+        message = await super().send(content, **kwargs)
+        if delete_after is not None:
+            self.bot.cleanup.schedule(message, delete_after)
+        return message
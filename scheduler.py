@@ -0,0 +1,196 @@
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import time
+
+from logs import get_logger
+
+log = get_logger("scheduler")
+
+
+# === Persistent Timer Scheduler ===
+def _write_jobs(path, jobs):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(jobs, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class TimerScheduler:
+    """Time-ordered queue of timed moderation actions.
+
+    Jobs are plain dicts (``action``, ``due`` and whatever the handler
+    needs) kept in a heap and saved to a JSON file, so pending unmutes
+    survive restarts. A single task sleeps until the earliest job is due
+    instead of every mute pinning its own sleeping coroutine.
+    """
+
+    def __init__(self, path="timers.json"):
+        self.path = path
+        self.handlers = {}
+        self._heap = []
+        self._ids = itertools.count(1)
+        self._wakeup = asyncio.Event()
+        self._save_lock = asyncio.Lock()
+        self._task = None
+        self._firing = set()  # strong refs so running handlers aren't GC'd
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                jobs = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            jobs = []
+        for job in jobs:
+            heapq.heappush(self._heap, (job["due"], job["id"], job))
+        if jobs:
+            self._ids = itertools.count(max(job["id"] for job in jobs) + 1)
+
+    def _write(self, jobs):
+        _write_jobs(self.path, jobs)
+
+    async def _save(self, changed):
+        """Persist the queue after ``changed`` jobs were added or removed"""
+        jobs = [job for _, _, job in self._heap]
+        async with self._save_lock:
+            await asyncio.to_thread(self._write, jobs)
+
+    def register(self, action, handler):
+        """Run ``await handler(job)`` when a job with this action is due"""
+        self.handlers[action] = handler
+
+    def __len__(self):
+        return len(self._heap)
+
+    def pending(self, **match):
+        """Pending jobs whose fields equal ``match``"""
+        return [job for _, _, job in self._heap if all(job.get(k) == v for k, v in match.items())]
+
+    async def schedule(self, action, delay, **data):
+        """Queue ``action`` to run ``delay`` seconds from now"""
+        job = {"id": next(self._ids), "action": action, "due": time.time() + delay, **data}
+        heapq.heappush(self._heap, (job["due"], job["id"], job))
+        self._wakeup.set()
+        await self._save([job])
+        return job
+
+    async def cancel(self, action, **match):
+        """Drop pending jobs for ``action`` matching ``match``; returns how many"""
+        keep, removed = [], []
+        for entry in self._heap:
+            job = entry[2]
+            if job["action"] == action and all(job.get(k) == v for k, v in match.items()):
+                removed.append(job)
+            else:
+                keep.append(entry)
+        if removed:
+            heapq.heapify(keep)
+            self._heap = keep
+            self._wakeup.set()
+            await self._save(removed)
+        return len(removed)
+
+    def start(self):
+        """Start the wakeup loop; overdue jobs from before a restart run at once"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    continue  # queue changed, re-check the earliest job
+                except asyncio.TimeoutError:
+                    pass
+            now = time.time()
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[2])
+            await self._save(due)
+            for job in due:
+                task = asyncio.create_task(self._fire(job))
+                self._firing.add(task)
+                task.add_done_callback(self._firing.discard)
+
+    async def _fire(self, job):
+        handler = self.handlers.get(job["action"])
+        if handler is None:
+            log.warning("⚠️ No handler for timed action", action=job["action"])
+            return
+        try:
+            await handler(job)
+        except Exception as e:
+            log.error("⚠️ Timed action failed", action=job["action"], exc_info=e)
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+class GuildTimerScheduler(TimerScheduler):
+    """TimerScheduler for one shard process, saved as one file per guild.
+
+    Every job carries a ``guild_id``. Jobs live in ``<directory>/<guild_id>.json``
+    and a process loads only the files of guilds ``owns()`` accepts, so
+    when the shard or process count changes each guild's pending unmutes
+    and lockdown lifts move with it to whichever process now has it.
+    """
+
+    def __init__(self, directory="timers", owns=None):
+        self.directory = directory
+        self.owns = owns or (lambda guild_id: True)
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(path=None)
+
+    def _guild_path(self, guild_id):
+        return os.path.join(self.directory, f"{guild_id}.json")
+
+    def _load(self):
+        jobs = []
+        for name in os.listdir(self.directory):
+            stem, ext = os.path.splitext(name)
+            if ext != ".json" or not stem.isdigit() or not self.owns(int(stem)):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), 'r') as f:
+                    jobs.extend(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                log.warning("⚠️ Could not load timers", guild=stem, error=e)
+        for job in jobs:
+            heapq.heappush(self._heap, (job["due"], job["id"], job))
+        if jobs:
+            self._ids = itertools.count(max(job["id"] for job in jobs) + 1)
+
+    def _write(self, by_guild):
+        for guild_id, jobs in by_guild.items():
+            path = self._guild_path(guild_id)
+            if jobs:
+                _write_jobs(path, jobs)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    async def _save(self, changed):
+        # Only the guilds whose jobs changed are rewritten
+        guilds = {job["guild_id"] for job in changed}
+        by_guild = {guild_id: [] for guild_id in guilds}
+        for _, _, job in self._heap:
+            if job["guild_id"] in guilds:
+                by_guild[job["guild_id"]].append(job)
+        async with self._save_lock:
+            await asyncio.to_thread(self._write, by_guild)
@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import secrets
+import subprocess
+import sys
+import time
+import urllib.request
+from multiprocessing.managers import BaseManager, DictProxy
+
+
+# === Shard Layout ===
+def shard_ranges(shard_count, processes):
+    """Split shard ids 0..shard_count-1 into contiguous per-process ranges"""
+    per_process, extra = divmod(shard_count, processes)
+    ranges = []
+    start = 0
+    for i in range(processes):
+        size = per_process + (1 if i < extra else 0)
+        if size:
+            ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def shard_for_guild(guild_id, shard_count):
+    """The shard Discord delivers a guild's events to"""
+    return (guild_id >> 22) % shard_count
+
+
+def recommended_shards(token):
+    """Ask Discord how many shards this bot should run"""
+    req = urllib.request.Request(
+        "https://discord.com/api/v10/gateway/bot",
+        headers={"Authorization": f"Bot {token}", "User-Agent": "DiscordBot (XGuard, 1.0)"},
+    )
+    with urllib.request.urlopen(req, timeout=10) as resp:
+        return json.load(resp)["shards"]
+
+
+# === Shared State ===
+# The launcher hosts one StateManager server process for the few counters
+# every shard process should agree on ($status). Reputation isn't here:
+# Discord sends a guild's events to one shard only, so each worker keeps
+# the scores of its own guilds in-process (see main.py) rather than paying
+# a socket round-trip per message.
+_raid_stats = None
+
+
+def _get_raid_stats():
+    global _raid_stats
+    if _raid_stats is None:
+        _raid_stats = {"raids_blocked": 0, "suspicious_flagged": 0}
+    return _raid_stats
+
+
+class StateManager(BaseManager):
+    pass
+
+
+StateManager.register("raid_stats", callable=_get_raid_stats, proxytype=DictProxy)
+
+
+def worker_config():
+    """Shard settings passed to a worker by the launcher, or None"""
+    if "SHARD_IDS" not in os.environ:
+        return None
+    host, port = os.environ["STATE_ADDRESS"].rsplit(":", 1)
+    return {
+        "shard_ids": [int(s) for s in os.environ["SHARD_IDS"].split(",")],
+        "shard_count": int(os.environ["SHARD_COUNT"]),
+        "worker_index": int(os.environ.get("WORKER_INDEX", 0)),
+        "state_address": (host, int(port)),
+        "state_authkey": bytes.fromhex(os.environ["STATE_AUTHKEY"]),
+    }
+
+
+def connect_state(config):
+    """Connect a worker to the launcher's shared state server"""
+    manager = StateManager(address=config["state_address"], authkey=config["state_authkey"])
+    manager.connect()
+    return manager
+
+
+# === Launcher ===
+def launch(processes, shard_count, script="main.py"):
+    """Run ``shard_count`` shards split across ``processes`` worker processes"""
+    authkey = secrets.token_bytes(16)
+    manager = StateManager(address=("127.0.0.1", 0), authkey=authkey)
+    manager.start()
+    host, port = manager.address
+    ranges = shard_ranges(shard_count, processes)
+    print(f"🧩 Launching {shard_count} shards across {len(ranges)} processes")
+
+    def spawn(index):
+        env = dict(
+            os.environ,
+            SHARD_IDS=",".join(map(str, ranges[index])),
+            SHARD_COUNT=str(shard_count),
+            WORKER_INDEX=str(index),
+            STATE_ADDRESS=f"{host}:{port}",
+            STATE_AUTHKEY=authkey.hex(),
+        )
+        print(f"🧩 Worker {index}: shards {ranges[index][0]}-{ranges[index][-1]}")
+        return subprocess.Popen([sys.executable, script], env=env)
+
+    workers = [spawn(i) for i in range(len(ranges))]
+    try:
+        while True:
+            time.sleep(5)
+            for i, proc in enumerate(workers):
+                code = proc.poll()
+                if code is not None and code != 0:
+                    # Crashed worker: bring its shard range back up
+                    print(f"⚠️ Worker {i} exited with {code}, restarting")
+                    workers[i] = spawn(i)
+            if all(proc.poll() == 0 for proc in workers):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for proc in workers:
+            if proc.poll() is None:
+                proc.terminate()
+        for proc in workers:
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        manager.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the bot as several sharded processes")
+    parser.add_argument("--processes", type=int, default=int(os.environ.get("SHARD_PROCESSES", 2)))
+    parser.add_argument("--shards", type=int, default=int(os.environ.get("SHARD_TOTAL", 0)),
+                        help="total shard count (default: Discord's recommendation)")
+    args = parser.parse_args()
+
+    shards = args.shards
+    if not shards:
+        token = os.getenv("TOKEN")
+        if not token:
+            sys.exit("❌ ERROR: TOKEN environment variable not set!")
+        shards = max(recommended_shards(token), args.processes)
+    launch(max(1, args.processes), shards)
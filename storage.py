@@ -0,0 +1,562 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from columns import ColumnarRows
+from logs import get_logger
+
+log = get_logger("storage")
+
+
+# === Storage Backends ===
+class StorageBackend:
+    """Interface for where reputation rows are persisted.
+
+    Rows are kept per guild as ``user_id -> (score, last_active)``, so one
+    guild can be loaded, saved or dropped without touching the others.
+    ``last_active`` may be None for users carried over from the old
+    score-only format. Each guild may also have a small settings dict.
+    """
+
+    # save() expects a guild's full row set rather than just the changed rows
+    full_snapshot = False
+    # load_guild() may return, and save() expects, ColumnarRows instead of a dict
+    columnar = False
+    # get() answers from an index, so guilds needn't be loaded whole
+    point_lookups = False
+
+    def guilds(self):
+        """Ids of every guild with saved rows"""
+        return []
+
+    def load_guild(self, guild_id):
+        raise NotImplementedError
+
+    def save(self, guild_id, rows):
+        raise NotImplementedError
+
+    def clear(self, guild_id):
+        """Delete every saved row of a guild (its settings stay)"""
+        raise NotImplementedError
+
+    def load_config(self, guild_id):
+        return None
+
+    def save_config(self, guild_id, config):
+        raise NotImplementedError
+
+    def load_legacy(self):
+        """Rows from the old bot-wide layout, keyed by user only"""
+        return {}
+
+    def close(self):
+        pass
+
+
+def _parse_rows(data):
+    rows = {}
+    for k, v in data.items():
+        # Convert keys back to integers (JSON saves them as strings);
+        # old files store a bare score, newer ones [score, last_active]
+        if isinstance(v, list):
+            rows[int(k)] = (v[0], v[1])
+        else:
+            rows[int(k)] = (v, None)
+    return rows
+
+
+class JsonBackend(StorageBackend):
+    """One JSON file per guild (plus one for its settings) in a directory.
+
+    The original bot-wide reputation.json is still read as the legacy
+    layout: a user's old score is where they start in every guild.
+    """
+
+    full_snapshot = True
+    _GUILD_FILE = re.compile(r"^(\d+)\.json$")
+
+    def __init__(self, directory="reputation", legacy_path="reputation.json"):
+        self.directory = directory
+        self.legacy_path = legacy_path
+        os.makedirs(directory, exist_ok=True)
+
+    def _read(self, path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write(self, path, data):
+        # Write to a temp file and atomically swap it in, so a crash
+        # mid-write never leaves a truncated file behind
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def guilds(self):
+        matches = (self._GUILD_FILE.match(name) for name in os.listdir(self.directory))
+        return [int(m.group(1)) for m in matches if m]
+
+    def load_guild(self, guild_id):
+        return _parse_rows(self._read(os.path.join(self.directory, f"{guild_id}.json")) or {})
+
+    def save(self, guild_id, rows):
+        self._write(
+            os.path.join(self.directory, f"{guild_id}.json"),
+            {uid: [score, active] for uid, (score, active) in rows.items()},
+        )
+
+    def clear(self, guild_id):
+        for name in (f"{guild_id}.json", f"{guild_id}.rep"):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def load_config(self, guild_id):
+        return self._read(os.path.join(self.directory, f"{guild_id}.config.json"))
+
+    def save_config(self, guild_id, config):
+        self._write(os.path.join(self.directory, f"{guild_id}.config.json"), config)
+
+    def load_legacy(self):
+        if not self.legacy_path:
+            return {}
+        return _parse_rows(self._read(self.legacy_path) or {})
+
+
+class SnapshotBackend(JsonBackend):
+    """Binary column snapshots, ``<guild_id>.rep`` (see columns.py).
+
+    Loading a guild memory-maps its file and copies the columns out whole,
+    with no per-user parsing. Settings and the legacy file stay JSON, and a
+    guild that only has a JSON backend ``<guild_id>.json`` is read from it
+    and saved as a snapshot from then on.
+    """
+
+    columnar = True
+    _SNAPSHOT_FILE = re.compile(r"^(\d+)\.rep$")
+
+    def guilds(self):
+        names = os.listdir(self.directory)
+        matches = (self._SNAPSHOT_FILE.match(name) or self._GUILD_FILE.match(name) for name in names)
+        return sorted({int(m.group(1)) for m in matches if m})
+
+    def load_guild(self, guild_id):
+        path = os.path.join(self.directory, f"{guild_id}.rep")
+        if os.path.exists(path):
+            return ColumnarRows.read(path)
+        return super().load_guild(guild_id)
+
+    def save(self, guild_id, rows):
+        rows.write(os.path.join(self.directory, f"{guild_id}.rep"))
+
+
+class SqliteBackend(StorageBackend):
+    """Indexed SQLite database in WAL mode with per-user upserts.
+
+    Single users are read straight from the primary key, so the store
+    never has to load a whole guild to answer them.
+    """
+
+    point_lookups = True
+
+    def __init__(self, path="reputation.db"):
+        self.path = path
+        self._local = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
+        conn = self._conn()
+        with conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(reputation)")]
+            if columns and "guild_id" not in columns:
+                # Bot-wide table from before guild namespaces; kept as legacy rows
+                conn.execute("ALTER TABLE reputation RENAME TO reputation_legacy")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reputation ("
+                " guild_id INTEGER NOT NULL,"
+                " user_id INTEGER NOT NULL,"
+                " score INTEGER NOT NULL,"
+                " last_active REAL,"
+                " PRIMARY KEY (guild_id, user_id))"
+            )
+            # Score index from older builds; nothing reads by score any more
+            # and it only slowed every upsert down
+            conn.execute("DROP INDEX IF EXISTS reputation_score")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS guild_config ("
+                " guild_id INTEGER PRIMARY KEY,"
+                " data TEXT NOT NULL)"
+            )
+
+    def _conn(self):
+        # One connection per thread: WAL lets the flusher write while the
+        # event loop keeps reading
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3  # only paid for when the SQLite backend is in use
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def guilds(self):
+        return [row[0] for row in self._conn().execute("SELECT DISTINCT guild_id FROM reputation")]
+
+    def load_guild(self, guild_id):
+        cur = self._conn().execute(
+            "SELECT user_id, score, last_active FROM reputation WHERE guild_id = ?", (guild_id,)
+        )
+        return {uid: (score, active) for uid, score, active in cur}
+
+    def get(self, guild_id, user_id):
+        row = self._conn().execute(
+            "SELECT score, last_active FROM reputation WHERE guild_id = ? AND user_id = ?", (guild_id, user_id)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def save(self, guild_id, rows):
+        conn = self._conn()
+        with conn:  # one transaction per batch
+            conn.executemany(
+                "INSERT INTO reputation (guild_id, user_id, score, last_active) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(guild_id, user_id) DO UPDATE SET"
+                " score = excluded.score, last_active = excluded.last_active",
+                ((guild_id, uid, score, active) for uid, (score, active) in rows.items()),
+            )
+
+    def clear(self, guild_id):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM reputation WHERE guild_id = ?", (guild_id,))
+
+    def load_config(self, guild_id):
+        row = self._conn().execute(
+            "SELECT data FROM guild_config WHERE guild_id = ?", (guild_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_config(self, guild_id, config):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO guild_config (guild_id, data) VALUES (?, ?)"
+                " ON CONFLICT(guild_id) DO UPDATE SET data = excluded.data",
+                (guild_id, json.dumps(config)),
+            )
+
+    def load_legacy(self):
+        conn = self._conn()
+        if not conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reputation_legacy'"
+        ).fetchone():
+            return {}
+        cur = conn.execute("SELECT user_id, score, last_active FROM reputation_legacy")
+        return {uid: (score, active) for uid, score, active in cur}
+
+    def save_legacy(self, rows):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reputation_legacy ("
+                " user_id INTEGER PRIMARY KEY,"
+                " score INTEGER NOT NULL,"
+                " last_active REAL)"
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO reputation_legacy (user_id, score, last_active) VALUES (?, ?, ?)",
+                ((uid, score, active) for uid, (score, active) in rows.items()),
+            )
+
+    def close(self):
+        with self._conns_lock:
+            for conn in self._conns:
+                conn.close()
+            self._conns.clear()
+        self._local = threading.local()
+
+
+# === Write-Behind Reputation Store ===
+class GuildRows:
+    """One guild's scores held in memory, as packed columns (see columns.py).
+
+    ``partial`` guilds hold only the users read or changed since the guild
+    was loaded; everyone else is still only in the backend.
+    """
+
+    __slots__ = ("rows", "dirty", "used_at", "partial")
+
+    def __init__(self, rows, partial=False):
+        self.rows = rows if isinstance(rows, ColumnarRows) else ColumnarRows.from_rows(rows)
+        self.dirty = set()
+        self.used_at = time.monotonic()
+        self.partial = partial
+
+
+class ReputationStore:
+    """In-memory reputation scores with coalesced background saves.
+
+    Guilds are loaded whole on first use and can be evicted again once
+    idle. With a backend that has point lookups (SQLite) only the users
+    actually read or changed are brought into memory. Mutations only mark
+    users dirty. A daemon thread hands each
+    guild's changed rows to the backend once per interval (or sooner once
+    enough changes pile up), so the event loop never waits on disk I/O.
+    """
+
+    def __init__(self, backend, flush_interval=60.0, flush_threshold=500):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.guilds = {}            # guild_id -> GuildRows
+        self._legacy = None
+        self._pending = 0           # users marked dirty since the last flush
+        self._lock = threading.Lock()         # guards data snapshots
+        self._write_lock = threading.Lock()   # one writer at a time
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._housekeeping = None
+
+    # --- guilds ---
+    def load(self, guild_id):
+        """Bring a guild's rows into memory (blocking the first time)"""
+        data = self.guilds.get(guild_id)
+        if data is None:
+            if self.backend.point_lookups:
+                loaded = GuildRows({}, partial=True)
+            else:
+                loaded = GuildRows(self.backend.load_guild(guild_id))
+            with self._lock:
+                # Another thread may have loaded it meanwhile; keep theirs
+                data = self.guilds.setdefault(guild_id, loaded)
+        data.used_at = time.monotonic()
+        return data
+
+    def idle_guilds(self, max_idle):
+        cutoff = time.monotonic() - max_idle
+        return [g for g, data in list(self.guilds.items()) if data.used_at <= cutoff]
+
+    def evict(self, guild_id):
+        """Save a guild's changes and drop it from memory; False if it stays loaded"""
+        with self._write_lock:
+            data = self.guilds.get(guild_id)
+            if data is None:
+                return False
+            self._save(guild_id, data, *self._take(data))
+            with self._lock:
+                if data.dirty:
+                    return False  # written to while saving
+                del self.guilds[guild_id]
+            return True
+
+    def clear(self, guild_id):
+        """Delete a guild's rows, saved and unsaved (blocking)"""
+        with self._write_lock:
+            self.backend.clear(guild_id)
+            with self._lock:
+                data = self.guilds.pop(guild_id, None)
+                if data is not None:
+                    self._pending = max(0, self._pending - len(data.dirty))
+
+    # --- reads ---
+    def _legacy_row(self, user_id):
+        if self._legacy is None:
+            self._legacy = self.backend.load_legacy()
+        return self._legacy.get(user_id)
+
+    def get(self, guild_id, user_id):
+        """``(score, last_active)`` for a user in a guild, or None if they have none"""
+        data = self.load(guild_id)
+        row = data.rows.get(user_id)
+        if row is None and data.partial:
+            row = self.backend.get(guild_id, user_id)
+            if row is not None:
+                with self._lock:
+                    # Keep it for next time, unless it changed meanwhile
+                    if user_id not in data.rows:
+                        data.rows.set(user_id, *row)
+                    row = data.rows.get(user_id)
+        if row is None:
+            return self._legacy_row(user_id)
+        return row
+
+    def rows(self, guild_id):
+        """Every ``(user_id, (score, last_active))`` in a guild, including unsaved changes"""
+        data = self.load(guild_id)
+        if data.partial:
+            # Backend first: whatever is in memory by the time it's read is newer
+            rows = self.backend.load_guild(guild_id)
+            with self._lock:
+                cached = data.rows.copy()
+            rows.update(cached.items())
+            return list(rows.items())
+        with self._lock:
+            rows = data.rows.copy()   # a few memcpys; the walk happens unlocked
+        return list(rows.items())
+
+    def load_config(self, guild_id):
+        return self.backend.load_config(guild_id)
+
+    # --- mutations ---
+    def set(self, guild_id, user_id, score, last_active=None):
+        while True:
+            data = self.load(guild_id)
+            with self._lock:
+                if self.guilds.get(guild_id) is not data:
+                    continue  # evicted between load and lock; load it again
+                data.rows.set(user_id, score, last_active)
+                if user_id not in data.dirty:
+                    data.dirty.add(user_id)
+                    self._pending += 1
+                break
+        if self._pending >= self.flush_threshold:
+            self._wakeup.set()
+
+    def save_config(self, guild_id, config):
+        """Write a guild's settings straight through (they change rarely)"""
+        self.backend.save_config(guild_id, config)
+
+    @property
+    def dirty(self):
+        return any(data.dirty for data in list(self.guilds.values()))
+
+    # --- flushing ---
+    def start(self, housekeeping=None):
+        """Start the background flusher (safe to call more than once).
+
+        ``housekeeping`` is called after every flush, e.g. to evict idle guilds.
+        """
+        self._housekeeping = housekeeping
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="reputation-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if self._housekeeping:
+                    self._housekeeping()
+            except Exception:
+                log.exception("⚠️ Reputation flush failed")
+
+    def _take(self, data, force=False):
+        """Claim a guild's dirty users and snapshot the rows to write (or None)"""
+        with self._lock:
+            changed = data.dirty
+            if not changed and not force:
+                return changed, None
+            data.dirty = set()
+            self._pending = max(0, self._pending - len(changed))
+            if self.backend.columnar:
+                return changed, data.rows.copy()
+            if self.backend.full_snapshot:
+                return changed, dict(data.rows.items())
+            return changed, data.rows.select(changed)
+
+    def _save(self, guild_id, data, changed, rows):
+        if rows is None:
+            return
+        try:
+            self.backend.save(guild_id, rows)
+        except Exception:
+            # Keep the changes marked so the next flush retries them
+            with self._lock:
+                data.dirty |= changed
+                self._pending += len(changed)
+            raise
+
+    def flush(self, force=False):
+        """Hand changed rows to the backend, guild by guild. Blocking."""
+        with self._write_lock:
+            saved = False
+            error = None
+            for guild_id, data in list(self.guilds.items()):
+                changed, rows = self._take(data, force)
+                try:
+                    self._save(guild_id, data, changed, rows)
+                except Exception as e:
+                    error = error or e  # still try the other guilds
+                saved = saved or rows is not None
+            if error is not None:
+                raise error
+            return saved
+
+    def close(self):
+        """Stop the flusher, perform a final blocking save and release the backend"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+        self.backend.close()
+
+
+def backend_from_env():
+    """Pick the storage backend from REP_BACKEND (json, snapshot or sqlite)"""
+    kind = os.environ.get("REP_BACKEND", "snapshot").lower()
+    if kind == "sqlite":
+        return SqliteBackend(os.environ.get("REP_DB_PATH", "reputation.db"))
+    if kind in ("json", "snapshot"):
+        cls = SnapshotBackend if kind == "snapshot" else JsonBackend
+        return cls(
+            os.environ.get("REP_DIR", "reputation"),
+            legacy_path=os.environ.get("REP_PATH", "reputation.json"),
+        )
+    raise ValueError(f"Unknown REP_BACKEND: {kind}")
+
+
+def store_from_env():
+    """Build the reputation store using REP_* environment settings"""
+    return ReputationStore(
+        backend_from_env(),
+        flush_interval=float(os.environ.get("REP_FLUSH_INTERVAL", 60)),
+        flush_threshold=int(os.environ.get("REP_FLUSH_THRESHOLD", 500)),
+    )
+
+
+def migrate_json_to_sqlite(json_dir="reputation", db_path="reputation.db", legacy_path="reputation.json"):
+    """One-shot copy of the JSON (or snapshot) reputation files into a SQLite database"""
+    source = SnapshotBackend(json_dir, legacy_path=legacy_path)
+    backend = SqliteBackend(db_path)
+    count = 0
+    try:
+        legacy = source.load_legacy()
+        if legacy:
+            backend.save_legacy(legacy)
+        for guild_id in source.guilds():
+            rows = source.load_guild(guild_id)
+            if isinstance(rows, ColumnarRows):
+                rows = dict(rows.items())
+            backend.save(guild_id, rows)
+            config = source.load_config(guild_id)
+            if config is not None:
+                backend.save_config(guild_id, config)
+            count += len(rows)
+    finally:
+        backend.close()
+    return count
+
+
+if __name__ == "__main__":
+    # python storage.py migrate [reputation/] [reputation.db] [reputation.json]
+    if len(sys.argv) >= 2 and sys.argv[1] == "migrate":
+        count = migrate_json_to_sqlite(*sys.argv[2:5])
+        print(f"💾 Migrated {count} guild scores to SQLite")
+    else:
+        print("Usage: python storage.py migrate [reputation/] [reputation.db] [reputation.json]")
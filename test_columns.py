@@ -0,0 +1,104 @@
+import os
+import random
+import struct
+import sys
+import tempfile
+import unittest
+from array import array
+
+from columns import _HEADER, _MAGIC, _VERSION, ColumnarRows
+
+
+def random_rows(rng, users):
+    return {
+        rng.getrandbits(63): (rng.randint(100, 1000), None if rng.random() < 0.1 else rng.uniform(1e9, 2e9))
+        for _ in range(users)
+    }
+
+
+class HashIndexTest(unittest.TestCase):
+    def test_matches_dict(self):
+        rng = random.Random(0)
+        columns = ColumnarRows()
+        expected = {}
+        # Small ids collide in the table; large ones exercise the 64-bit hash
+        ids = [rng.randrange(64) for _ in range(200)] + [rng.getrandbits(63) for _ in range(3000)]
+        for user_id in ids:
+            score = rng.randint(0, 1000)
+            active = None if rng.random() < 0.2 else rng.uniform(0, 1e9)
+            previous = expected.get(user_id)
+            columns.set(user_id, score, active)
+            # last_active=None keeps the previous timestamp
+            expected[user_id] = (score, previous[1] if active is None and previous else active)
+        self.assertEqual(len(columns), len(expected))
+        for user_id, row in expected.items():
+            self.assertIn(user_id, columns)
+            self.assertEqual(columns.get(user_id), row)
+        self.assertIsNone(columns.get(-1))
+        self.assertEqual(dict(columns.items()), expected)
+        self.assertEqual(dict(ColumnarRows.from_rows(expected).items()), expected)
+        self.assertEqual(dict(columns.copy().items()), expected)
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "1.rep")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        rows = random_rows(random.Random(2), 5000)
+        ColumnarRows.from_rows(rows).write(self.path)
+        loaded = ColumnarRows.read(self.path)
+        self.assertEqual(dict(loaded.items()), rows)
+        # The index comes back usable, not just the columns
+        user_id = next(iter(rows))
+        self.assertEqual(loaded.get(user_id), rows[user_id])
+        loaded.set(7, 123, 1.0)
+        self.assertEqual(loaded.get(7), (123, 1.0))
+        self.assertFalse(os.path.exists(f"{self.path}.tmp"))
+
+    def test_empty(self):
+        ColumnarRows().write(self.path)
+        self.assertEqual(len(ColumnarRows.read(self.path)), 0)
+
+    def test_header_layout(self):
+        # The on-disk format is shared with every saved guild; changing it
+        # needs a new _VERSION
+        self.assertEqual((_MAGIC, _VERSION, _HEADER.format, _HEADER.size), (b"XREP", 1, "<4sH?xQQ", 24))
+        columns = ColumnarRows.from_rows({5: (150, 10.0)})
+        columns.write(self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        magic, version, little, count, table_size = _HEADER.unpack_from(data)
+        self.assertEqual((magic, version, little, count), (b"XREP", 1, sys.byteorder == "little", 1))
+        self.assertEqual(len(data), _HEADER.size + 8 + 8 + 4 + 4 * table_size)
+
+    def test_other_byte_order(self):
+        rows = random_rows(random.Random(3), 300)
+        columns = ColumnarRows.from_rows(rows)
+        # Write the file a machine of the other byte order would have
+        with open(self.path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, sys.byteorder != "little", len(columns), len(columns.table)))
+            for column in (columns.ids, columns.last_active, columns.scores, columns.table):
+                swapped = array(column.typecode, column)
+                swapped.byteswap()
+                swapped.tofile(f)
+        self.assertEqual(dict(ColumnarRows.read(self.path).items()), rows)
+
+    def test_rejects_bad_files(self):
+        ColumnarRows.from_rows(random_rows(random.Random(4), 100)).write(self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for bad in (data[:10], data[:-4], data + b"\0", b"NOPE" + data[4:],
+                    data[:4] + struct.pack("<H", _VERSION + 1) + data[6:]):
+            with open(self.path, "wb") as f:
+                f.write(bad)
+            with self.assertRaises(ValueError):
+                ColumnarRows.read(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
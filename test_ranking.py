@@ -0,0 +1,90 @@
+import random
+import unittest
+
+from ranking import Fenwick, RankIndex
+from reputation import GuildConfig
+
+
+def expected(config, rows, now):
+    """Current scores the brute-force way, as $rep reports them"""
+    return {
+        user_id: min(max(config.decayed(score, active, now), config.base_rep), config.max_rep)
+        for user_id, (score, active) in rows.items()
+    }
+
+
+class FenwickTest(unittest.TestCase):
+    def test_prefix_and_find(self):
+        rng = random.Random(0)
+        counts = [rng.randrange(4) for _ in range(37)]
+        tree = Fenwick(len(counts))
+        for i, count in enumerate(counts):
+            tree.add(i, count)
+        for i in range(len(counts)):
+            self.assertEqual(tree.prefix(i), sum(counts[:i + 1]))
+        for k in range(1, sum(counts) + 1):
+            pos = tree.find(k)
+            self.assertGreaterEqual(tree.prefix(pos), k)
+            self.assertLess(tree.prefix(pos - 1), k)
+
+
+class RankIndexTest(unittest.TestCase):
+    def check(self, index, config, rows, now):
+        current = expected(config, rows, now)
+        ordered = sorted(current.values(), reverse=True)
+        for user_id, score in current.items():
+            self.assertEqual(index.current(user_id), score)
+            self.assertEqual(index.rank(user_id), 1 + sum(s > score for s in current.values()))
+        for offset in (0, 1, len(current) // 2, len(current)):
+            page = index.top(7, offset)
+            self.assertEqual([score for _, score in page], ordered[offset:offset + 7])
+            self.assertTrue(all(current[user_id] == score for user_id, score in page))
+        self.assertEqual(sorted(u for u, _ in index.top(len(current) + 1)), sorted(current))
+
+    def test_matches_brute_force(self):
+        # Random activity, idle gaps from minutes to days, lowered caps,
+        # users with no activity time and decay switched off
+        for seed in range(30):
+            rng = random.Random(seed)
+            config = GuildConfig(max_rep=rng.choice([150, 1000]), decay_points=rng.choice([0, 1, 5, 37]),
+                                 decay_period=rng.choice([7, 1800]))
+            period = config.decay_period
+            now = rng.uniform(1e6, 2e6)
+            rows = {
+                user_id: (rng.randint(50, config.max_rep + 100),
+                          None if rng.random() < 0.1 else now - rng.uniform(0, period * 40))
+                for user_id in range(rng.randint(0, 60))
+            }
+            index = RankIndex.from_rows(config.base_rep, config.max_rep, config.decay_points, period,
+                                        rows.items(), now)
+            for _ in range(40):
+                if rng.random() < 0.5:
+                    now += rng.uniform(0, period * rng.choice([0.1, 1, 5, 300]))
+                    index.advance(now)
+                else:
+                    user_id = rng.randrange(80)
+                    rows[user_id] = (rng.randint(101, config.max_rep), now)
+                    index.update(user_id, rows[user_id][0], now, now)
+                self.check(index, config, rows, now)
+
+    def test_ties_share_a_place(self):
+        index = RankIndex(100, 1000, 5, 1800)
+        for user_id, score in enumerate([500, 300, 500, 100]):
+            index.update(user_id, score, 0.0, 0.0)
+        self.assertEqual([index.rank(u) for u in range(4)], [1, 3, 1, 4])
+        self.assertEqual([score for _, score in index.top(2, 1)], [500, 300])
+        self.assertIsNone(index.rank(99))
+
+    def test_long_idle_reaches_the_floor(self):
+        index = RankIndex(100, 1000, 5, 1800)
+        index.update(1, 1000, 0.0, 0.0)
+        index.update(2, 900, 0.0, 0.0)
+        index.advance(1800 * 500.0)
+        self.assertEqual(sorted(index.top(2)), [(1, 100), (2, 100)])
+        self.assertEqual(index.rank(2), 1)
+        index.update(2, 101, 1800 * 500.0, 1800 * 500.0)
+        self.assertEqual(index.top(1), [(2, 101)])
+
+
+if __name__ == "__main__":
+    unittest.main()
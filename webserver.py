@@ -0,0 +1,129 @@
+import asyncio
+import math
+import os
+import time
+
+import aiohttp
+from aiohttp import web
+
+from logs import get_logger
+
+log = get_logger("webserver")
+
+
+# === Health & Metrics Server ===
+class HealthServer:
+    """aiohttp server running on the bot's own event loop.
+
+    - ``/``        plain "Bot is running!" for uptime pingers
+    - ``/healthz`` JSON health; 503 when the gateway is down or the loop lags
+    - ``/metrics`` Prometheus text format
+
+    Other subsystems can add metrics by appending a callable to
+    ``metric_sources`` that returns lines of Prometheus text.
+    """
+
+    def __init__(self, bot, monitor, port=8080, ping_url=None, ping_interval=300, max_lag=2.0):
+        self.bot = bot
+        self.monitor = monitor      # instrumentation.LoopMonitor
+        self.port = port
+        self.ping_url = ping_url
+        self.ping_interval = ping_interval
+        self.max_lag = max_lag
+        self.started_at = time.time()
+        self.metric_sources = []
+        self._runner = None
+        self._tasks = []
+
+    # --- state ---
+    @property
+    def loop_lag(self):
+        return self.monitor.lag
+
+    def gateway_connected(self):
+        return self.bot.is_ready() and not self.bot.is_closed() and math.isfinite(self.bot.latency)
+
+    def health(self):
+        connected = self.gateway_connected()
+        latency = self.bot.latency if math.isfinite(self.bot.latency) else None
+        return {
+            "status": "ok" if connected and self.loop_lag < self.max_lag else "degraded",
+            "gateway_connected": connected,
+            "heartbeat_latency": latency,
+            "event_loop_lag": round(self.loop_lag, 4),
+            "guilds": len(self.bot.guilds),
+            "uptime": round(time.time() - self.started_at),
+        }
+
+    # --- routes ---
+    async def home(self, request):
+        return web.Response(text="Bot is running!")
+
+    async def healthz(self, request):
+        body = self.health()
+        return web.json_response(body, status=200 if body["status"] == "ok" else 503)
+
+    async def metrics(self, request):
+        health = self.health()
+        lines = [
+            "# TYPE xguard_gateway_connected gauge",
+            f"xguard_gateway_connected {int(health['gateway_connected'])}",
+            "# TYPE xguard_gateway_latency_seconds gauge",
+            f"xguard_gateway_latency_seconds {health['heartbeat_latency'] if health['heartbeat_latency'] is not None else 'NaN'}",
+            "# TYPE xguard_event_loop_lag_seconds gauge",
+            f"xguard_event_loop_lag_seconds {self.loop_lag:.6f}",
+            "# TYPE xguard_guilds gauge",
+            f"xguard_guilds {health['guilds']}",
+            "# TYPE xguard_uptime_seconds counter",
+            f"xguard_uptime_seconds {health['uptime']}",
+        ]
+        for source in self.metric_sources:
+            try:
+                lines.extend(source())
+            except Exception as e:
+                log.error("⚠️ Metrics source failed", exc_info=e)
+        return web.Response(text="\n".join(lines) + "\n", content_type="text/plain", charset="utf-8")
+
+    # --- background tasks ---
+    async def _self_ping(self):
+        # Optional: external self-ping (UptimeRobot or similar recommended)
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.get(self.ping_url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+                        await resp.read()
+                    log.debug("🔄 Pinged self to stay awake")
+                except Exception as e:
+                    log.warning("⚠️ Ping failed", error=e)
+                await asyncio.sleep(self.ping_interval)
+
+    async def start(self):
+        app = web.Application()
+        app.add_routes([
+            web.get("/", self.home),
+            web.get("/healthz", self.healthz),
+            web.get("/metrics", self.metrics),
+        ])
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "0.0.0.0", self.port).start()
+        log.info("🟢 Health server listening", port=self.port)
+        if self.ping_url:
+            self._tasks.append(asyncio.create_task(self._self_ping()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def health_server_from_env(bot, monitor):
+    return HealthServer(
+        bot,
+        monitor,
+        port=int(os.environ.get("PORT", 8080)),
+        ping_url=os.environ.get("PING_URL"),  # set this in your host if needed
+    )